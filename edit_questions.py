@@ -1,17 +1,29 @@
 #!/usr/bin/env python3
 """Interactive editor for questions.json — Magyar Exam study app."""
 
+import io
 import json
+import mmap
 import os
+import shutil
 import sys
+import time
 import unicodedata
 import textwrap
+from collections import Counter
+
+try:
+    import orjson          # optional: much faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+if os.name == "nt":
+    import ctypes
 
 # ---------------------------------------------------------------------------
 # Ensure UTF-8 I/O on Windows (must happen before any print/input calls)
 # ---------------------------------------------------------------------------
 if os.name == "nt":
-    import io
     if hasattr(sys.stdout, "buffer"):
         sys.stdout = io.TextIOWrapper(
             sys.stdout.buffer, encoding="utf-8", errors="replace", line_buffering=True
@@ -62,12 +74,15 @@ PAGE_SIZE = 20
 
 def _detect_ansi() -> bool:
     """Return True if this terminal likely supports ANSI escape codes."""
+    # Piped / redirected output never gets colors — and skipping the probe
+    # below avoids spawning a shell on every non-interactive run.
+    if not sys.stdout.isatty():
+        return False
     if os.name == "nt":
         # Enable VT100 processing on Windows 10+
         try:
             ret = os.system("")   # empty command; side-effect: enables VT mode
             # Also try the ctypes route for a reliable check
-            import ctypes
             kernel32 = ctypes.windll.kernel32
             # ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
             handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
@@ -78,8 +93,8 @@ def _detect_ansi() -> bool:
             return False
         except Exception:
             return False
-    # On Unix-likes, check for a real TTY
-    return sys.stdout.isatty()
+    # On Unix-likes a real TTY is enough
+    return True
 
 
 _ANSI = _detect_ansi()
@@ -96,15 +111,30 @@ if _ANSI:
 else:
     BOLD = DIM = GREEN = YELLOW = RED = CYAN = RESET = ""
 
+# Pre-rendered rules and banner (depend on the color constants above)
+_DIVIDER_EQ   = "═" * 44
+_DIVIDER_DASH = "-" * 44
+_RULE_EQ      = f"{BOLD}{_DIVIDER_EQ}{RESET}"
+_RULE_DASH    = f"{BOLD}{_DIVIDER_DASH}{RESET}"
+_TITLE        = f"{BOLD}  Magyar Exam — Question Editor{RESET}"
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+# str.translate table mapping every combining mark (category Mn) to None.
+# Built lazily on first use — scanning all code points takes ~100 ms.
+_MN_TABLE: dict = {}
+
+
 def normalize(text: str) -> str:
     """NFD-decompose, strip combining marks, lowercase — for accent-insensitive search."""
-    nfd = unicodedata.normalize("NFD", text)
-    stripped = "".join(ch for ch in nfd if unicodedata.category(ch) != "Mn")
-    return stripped.lower()
+    if not _MN_TABLE:
+        _MN_TABLE.update(
+            (cp, None) for cp in range(sys.maxunicode + 1)
+            if unicodedata.category(chr(cp)) == "Mn"
+        )
+    return unicodedata.normalize("NFD", text).translate(_MN_TABLE).lower()
 
 
 def stars(n: int) -> str:
@@ -138,31 +168,153 @@ def divider(char: str = "═", width: int = 44) -> str:
 
 
 def clear_screen() -> None:
-    os.system("cls" if os.name == "nt" else "clear")
+    if _ANSI:
+        # Erase display + cursor home; no subprocess needed
+        sys.stdout.write("\033[2J\033[H")
+        sys.stdout.flush()
+    else:
+        os.system("cls" if os.name == "nt" else "clear")
+
+
+def write_bytes(data: bytes) -> None:
+    """Write pre-encoded UTF-8 output straight to stdout's byte buffer."""
+    buf = getattr(sys.stdout, "buffer", None)
+    if buf is None:   # e.g. stdout replaced by a StringIO
+        sys.stdout.write(data.decode("utf-8"))
+        return
+    sys.stdout.flush()   # keep ordering with text already printed
+    buf.write(data)
+    buf.flush()
+
+
+def header_text(subtitle: str = "") -> str:
+    """Return the screen header block (with trailing newline)."""
+    sub = f"  {DIM}{subtitle}{RESET}\n" if subtitle else ""
+    return f"\n{_RULE_EQ}\n{_TITLE}\n{sub}{_RULE_EQ}\n"
 
 
 def print_header(subtitle: str = "") -> None:
-    print(f"\n{BOLD}{divider()}{RESET}")
-    print(f"{BOLD}  Magyar Exam — Question Editor{RESET}")
-    if subtitle:
-        print(f"  {DIM}{subtitle}{RESET}")
-    print(f"{BOLD}{divider()}{RESET}")
+    sys.stdout.write(header_text(subtitle))
+
+
+# ---------------------------------------------------------------------------
+# Per-question caches (kept index-aligned with the questions list)
+# ---------------------------------------------------------------------------
+
+# Column ("structure of arrays") caches: one entry per question, same order
+# as qs.  Search and the topic summary scan these instead of the dicts.
+_norm_cache: list = []        # normalized search haystack
+_trigram_cache: list = []     # frozenset of 3-grams of that haystack
+_list_line_bytes: list = []   # fmt_list_line() output + newline, UTF-8 encoded
+_card_bytes: list = []        # render_card() output + newline, UTF-8 encoded
+_topic_col: list = []         # q["topic"]
+_difficulty_col: list = []    # q["difficulty"] (default 1)
+
+_CACHES = (
+    _norm_cache, _trigram_cache, _list_line_bytes, _card_bytes,
+    _topic_col, _difficulty_col,
+)
+
+
+# Text fields searched by cmd_search (keywords_hu is appended separately)
+_SEARCH_FIELDS = ("question_hu", "question_en", "answer_hu", "answer_en")
+
+
+def _search_blob(q: dict) -> str:
+    """Return the normalized text that cmd_search matches against."""
+    get = q.get
+    parts = [get(field, "") for field in _SEARCH_FIELDS]
+    parts.append(" ".join(get("keywords_hu", [])))
+    return normalize(" ".join(parts))
+
+
+def trigrams(text: str) -> frozenset:
+    """Return the set of 3-character substrings of text."""
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _list_line_encoded(idx: int, q: dict) -> bytes:
+    """List-view line for qs[idx], ready for write_bytes()."""
+    return (fmt_list_line(idx + 1, q) + "\n").encode("utf-8")
+
+
+def _card_encoded(idx: int, q: dict) -> bytes:
+    """Full card for qs[idx], ready for write_bytes()."""
+    return (render_card(idx + 1, q) + "\n").encode("utf-8")
+
+
+def _cache_row(idx: int, q: dict) -> tuple:
+    """Compute every cached value for qs[idx], in _CACHES order."""
+    blob = _search_blob(q)
+    return (
+        blob,
+        trigrams(blob),
+        _list_line_encoded(idx, q),
+        _card_encoded(idx, q),
+        q.get("topic"),
+        q.get("difficulty", 1),
+    )
+
+
+def _rebuild_caches(qs: list) -> None:
+    """(Re)build every per-question cache from scratch."""
+    for cache in _CACHES:
+        cache.clear()
+    for i, q in enumerate(qs):
+        _cache_set(i, q)
+
+
+def _cache_set(idx: int, q: dict) -> None:
+    """Refresh the cache entries for qs[idx]; idx == len appends."""
+    appending = idx == len(_norm_cache)
+    for cache, value in zip(_CACHES, _cache_row(idx, q)):
+        if appending:
+            cache.append(value)
+        else:
+            cache[idx] = value
+
+
+def _cache_pop(qs: list, idx: int) -> None:
+    """Drop the cache entries for a deleted question (qs already popped)."""
+    for cache in _CACHES:
+        cache.pop(idx)
+    # Every later question moved up one place, so its #NNN label changed
+    for i in range(idx, len(qs)):
+        _list_line_bytes[i] = _list_line_encoded(i, qs[i])
+        _card_bytes[i] = _card_encoded(i, qs[i])
 
 
 # ---------------------------------------------------------------------------
 # Load / Save
 # ---------------------------------------------------------------------------
 
+def _read_json(path: str):
+    """Parse a JSON file; with orjson the file is mmap'd and parsed in place.
+
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    catch the stdlib exception either way.
+    """
+    with open(path, "rb") as fh:
+        if orjson is None or os.fstat(fh.fileno()).st_size == 0:
+            return json.loads(fh.read())
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()   # mmap cannot close while a view is alive
+
+
 def load_questions() -> list:
     """Load questions from QUESTIONS_FILE. Exit on failure."""
     if not os.path.isfile(QUESTIONS_FILE):
         print(f"{RED}Error: questions file not found:{RESET}\n  {QUESTIONS_FILE}")
         sys.exit(1)
     try:
-        with open(QUESTIONS_FILE, "r", encoding="utf-8") as fh:
-            data = json.load(fh)
+        data = _read_json(QUESTIONS_FILE)
         if not isinstance(data, list):
             raise ValueError("Expected a JSON array at top level.")
+        _rebuild_caches(data)
         return data
     except json.JSONDecodeError as exc:
         print(f"{RED}JSON parse error in {QUESTIONS_FILE}:{RESET}\n  {exc}")
@@ -172,20 +324,70 @@ def load_questions() -> list:
         sys.exit(1)
 
 
+def dump_questions(qs: list) -> bytes:
+    """Serialize questions to UTF-8 JSON bytes (2-space indent, non-ASCII kept)."""
+    if orjson is not None:
+        return orjson.dumps(qs, option=orjson.OPT_INDENT_2)
+    return json.dumps(qs, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    """Write payload to path via a fsync'd temp file and os.replace."""
+    # Replace the symlink's target, not the link itself
+    path = os.path.realpath(path)
+    dir_part = os.path.dirname(path)
+    if dir_part and not os.path.isdir(dir_part):
+        os.makedirs(dir_part, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+def _mirror_file(src: str, dst: str) -> None:
+    """Make dst an exact copy of src — a hardlink if possible, else a byte copy."""
+    dst = os.path.realpath(dst)
+    dir_part = os.path.dirname(dst)
+    if dir_part and not os.path.isdir(dir_part):
+        os.makedirs(dir_part, exist_ok=True)
+    tmp = dst + ".tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        # Cross-device, unsupported filesystem, etc.
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
 def save_questions(qs: list) -> None:
-    """Save questions to both QUESTIONS_FILE and DOCS_FILE."""
-    payload = json.dumps(qs, ensure_ascii=False, indent=2)
+    """Save questions to both QUESTIONS_FILE and DOCS_FILE.
+
+    The payload is serialized and written once; DOCS_FILE is then mirrored
+    from QUESTIONS_FILE so the two files can never diverge mid-save.
+    """
+    payload = dump_questions(qs)
     errors = []
 
-    for path in (QUESTIONS_FILE, DOCS_FILE):
-        try:
-            dir_part = os.path.dirname(path)
-            if dir_part and not os.path.isdir(dir_part):
-                os.makedirs(dir_part, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as fh:
-                fh.write(payload)
-        except Exception as exc:
-            errors.append(f"  {path}: {exc}")
+    primary_ok = False
+    try:
+        _write_atomic(QUESTIONS_FILE, payload)
+        primary_ok = True
+    except Exception as exc:
+        errors.append(f"  {QUESTIONS_FILE}: {exc}")
+
+    try:
+        if primary_ok and os.path.exists(DOCS_FILE) and os.path.samefile(QUESTIONS_FILE, DOCS_FILE):
+            pass   # DOCS_FILE is a symlink to QUESTIONS_FILE — already up to date
+        elif primary_ok:
+            _mirror_file(QUESTIONS_FILE, DOCS_FILE)
+        else:
+            _write_atomic(DOCS_FILE, payload)
+    except Exception as exc:
+        errors.append(f"  {DOCS_FILE}: {exc}")
 
     if errors:
         print(f"{RED}Warning — could not write to:{RESET}")
@@ -203,9 +405,8 @@ def fmt_list_line(idx_1based: int, q: dict) -> str:
     """One-line summary for the list view."""
     t_label = topic_label(q.get("topic"))
     diff    = stars(q.get("difficulty", 1))
-    qtext   = q.get("question_hu", "")[:60]
-    if len(q.get("question_hu", "")) > 60:
-        qtext += "…"
+    qfull   = q.get("question_hu", "")
+    qtext   = qfull[:60] + "…" if len(qfull) > 60 else qfull
     num = f"#{idx_1based:03d}"
     return (
         f"  {BOLD}{num}{RESET}  "
@@ -215,24 +416,36 @@ def fmt_list_line(idx_1based: int, q: dict) -> str:
     )
 
 
-def fmt_full_question(idx_1based: int, q: dict) -> None:
-    """Print a full question card."""
-    print(f"\n{BOLD}{divider('-', 44)}{RESET}")
-    print(f"  {BOLD}#{idx_1based:03d}{RESET}  "
-          f"{CYAN}{topic_full(q.get('topic'))}{RESET}  "
-          f"{YELLOW}{stars(q.get('difficulty', 1))}{RESET}")
-    print(f"{divider('-', 44)}")
-    print(f"  {BOLD}Kérdés (HU):{RESET}")
-    print(f"    {wrap(q.get('question_hu', ''))}")
-    print(f"  {DIM}Question (EN):{RESET}")
-    print(f"    {wrap(q.get('question_en', ''))}")
-    print(f"  {BOLD}Válasz (HU):{RESET}")
-    print(f"    {wrap(q.get('answer_hu', ''))}")
-    print(f"  {DIM}Answer (EN):{RESET}")
-    print(f"    {wrap(q.get('answer_en', ''))}")
+def render_card(idx_1based: int, q: dict) -> str:
+    """Return a full question card as one multi-line string."""
     kw = q.get("keywords_hu", [])
-    print(f"  {BOLD}Kulcsszavak:{RESET}  {', '.join(kw) if kw else '(none)'}")
-    print(f"{divider('-', 44)}")
+    return "\n".join([
+        "\n" + _RULE_DASH,
+        f"  {BOLD}#{idx_1based:03d}{RESET}  "
+        f"{CYAN}{topic_full(q.get('topic'))}{RESET}  "
+        f"{YELLOW}{stars(q.get('difficulty', 1))}{RESET}",
+        _DIVIDER_DASH,
+        f"  {BOLD}Kérdés (HU):{RESET}",
+        f"    {wrap(q.get('question_hu', ''))}",
+        f"  {DIM}Question (EN):{RESET}",
+        f"    {wrap(q.get('question_en', ''))}",
+        f"  {BOLD}Válasz (HU):{RESET}",
+        f"    {wrap(q.get('answer_hu', ''))}",
+        f"  {DIM}Answer (EN):{RESET}",
+        f"    {wrap(q.get('answer_en', ''))}",
+        f"  {BOLD}Kulcsszavak:{RESET}  {', '.join(kw) if kw else '(none)'}",
+        _DIVIDER_DASH,
+    ])
+
+
+def fmt_full_question(idx_1based: int, q: dict) -> None:
+    """Print a full question card (rendered fresh — used for previews)."""
+    print(render_card(idx_1based, q))
+
+
+def show_question(idx: int) -> None:
+    """Print the cached, pre-encoded card for saved question qs[idx]."""
+    write_bytes(_card_bytes[idx])
 
 
 # ---------------------------------------------------------------------------
@@ -331,16 +544,18 @@ def cmd_list(qs: list) -> None:
     total   = len(qs)
     pages   = (total + PAGE_SIZE - 1) // PAGE_SIZE
     page    = 0
+    footer  = f"\n  {DIM}[N]ext  [P]rev  [number] view full  [Enter] menu{RESET}\n".encode("utf-8")
+    screens: dict = {}   # page index -> fully rendered page (header, lines, footer)
 
     while True:
         clear_screen()
-        print_header(f"List — page {page + 1}/{pages}  ({total} questions total)")
-        start = page * PAGE_SIZE
-        end   = min(start + PAGE_SIZE, total)
-        for i in range(start, end):
-            print(fmt_list_line(i + 1, qs[i]))
+        if page not in screens:
+            start = page * PAGE_SIZE
+            end   = min(start + PAGE_SIZE, total)
+            header = header_text(f"List — page {page + 1}/{pages}  ({total} questions total)")
+            screens[page] = header.encode("utf-8") + b"".join(_list_line_bytes[start:end]) + footer
+        write_bytes(screens[page])
 
-        print(f"\n  {DIM}[N]ext  [P]rev  [number] view full  [Enter] menu{RESET}")
         try:
             raw = input("  > ").strip().lower()
         except EOFError:
@@ -361,7 +576,7 @@ def cmd_list(qs: list) -> None:
         elif raw.isdigit():
             idx = int(raw) - 1
             if 0 <= idx < total:
-                fmt_full_question(idx + 1, qs[idx])
+                show_question(idx)
                 input("  [Enter] to continue...")
             else:
                 print(f"  {RED}Invalid question number.{RESET}")
@@ -382,17 +597,13 @@ def cmd_search(qs: list) -> None:
         return
 
     norm_term = normalize(term)
+    # A haystack can only contain the term if it has all of the term's
+    # trigrams; the set test rejects most questions without a substring scan.
+    term_tri = trigrams(norm_term)
     matches = []
-    for idx, q in enumerate(qs):
-        haystack = " ".join([
-            q.get("question_hu", ""),
-            q.get("question_en", ""),
-            q.get("answer_hu", ""),
-            q.get("answer_en", ""),
-            " ".join(q.get("keywords_hu", [])),
-        ])
-        if norm_term in normalize(haystack):
-            matches.append((idx, q))
+    for idx, (blob, tri) in enumerate(zip(_norm_cache, _trigram_cache)):
+        if term_tri <= tri and norm_term in blob:
+            matches.append((idx, qs[idx]))
 
     if not matches:
         print(f"\n  {YELLOW}No matches for '{term}'.{RESET}")
@@ -400,8 +611,7 @@ def cmd_search(qs: list) -> None:
         return
 
     print(f"\n  {GREEN}{len(matches)} match(es):{RESET}\n")
-    for idx, q in matches:
-        print(fmt_list_line(idx + 1, q))
+    write_bytes(b"".join(_list_line_bytes[idx] for idx, _ in matches))
 
     print(f"\n  {DIM}Enter a question number to view it, or [Enter] to go back.{RESET}")
     try:
@@ -412,7 +622,7 @@ def cmd_search(qs: list) -> None:
     if raw.isdigit():
         idx = int(raw) - 1
         if 0 <= idx < len(qs):
-            fmt_full_question(idx + 1, qs[idx])
+            show_question(idx)
             input("  [Enter] to continue...")
         else:
             print(f"  {RED}Invalid question number.{RESET}")
@@ -450,6 +660,7 @@ def cmd_add(qs: list) -> None:
 
     if confirm("Save this question?", default=False):
         qs.append(new_q)
+        _cache_set(len(qs) - 1, new_q)
         save_questions(qs)
         print(f"  {GREEN}Question #{len(qs)} added.{RESET}")
     else:
@@ -483,7 +694,7 @@ def cmd_edit(qs: list) -> None:
         return
 
     q = qs[idx]
-    fmt_full_question(idx + 1, q)
+    show_question(idx)
     print(f"\n  {BOLD}Edit fields (press Enter to keep current value):{RESET}\n")
 
     # Topic
@@ -527,6 +738,7 @@ def cmd_edit(qs: list) -> None:
 
     if confirm("Save changes?", default=False):
         qs[idx] = updated_q
+        _cache_set(idx, updated_q)
         save_questions(qs)
         print(f"  {GREEN}Question #{idx + 1} updated.{RESET}")
     else:
@@ -559,11 +771,11 @@ def cmd_delete(qs: list) -> None:
         input("  [Enter] to continue...")
         return
 
-    q = qs[idx]
-    fmt_full_question(idx + 1, q)
+    show_question(idx)
 
     if confirm(f"{RED}Delete question #{idx + 1}?{RESET}", default=False):
         deleted = qs.pop(idx)
+        _cache_pop(qs, idx)
         save_questions(qs)
         short = deleted.get("question_hu", "")[:50]
         print(f"  {GREEN}Deleted:{RESET} {short}")
@@ -577,25 +789,20 @@ def cmd_topics(qs: list) -> None:
     """[T] Show topic summary."""
     print_header("Topic Summary")
 
-    # Gather stats per topic
-    topic_counts: dict = {}
-    topic_diff_sum: dict = {}
-
-    for q in qs:
-        t = q.get("topic")
-        d = q.get("difficulty", 1)
-        topic_counts[t]   = topic_counts.get(t, 0) + 1
-        topic_diff_sum[t] = topic_diff_sum.get(t, 0) + d
+    # Gather stats per topic from the column caches
+    # (Counter lookups default to 0, so unseen topics need no .get()).
+    topic_counts = Counter(_topic_col)
+    topic_diff_sum: Counter = Counter()
+    for t, d in zip(_topic_col, _difficulty_col):
+        topic_diff_sum[t] += d
 
     # Print known topics first, then any unknown ones
-    all_topics = sorted(
-        set(list(TOPIC_NAMES.keys()) + list(topic_counts.keys()))
-    )
+    all_topics = sorted(TOPIC_NAMES.keys() | topic_counts.keys())
 
     print()
     for t in all_topics:
-        count    = topic_counts.get(t, 0)
-        diff_sum = topic_diff_sum.get(t, 0)
+        count    = topic_counts[t]
+        diff_sum = topic_diff_sum[t]
         avg_diff = round(diff_sum / count) if count else 0
         label    = TOPIC_NAMES.get(t, f"Topic {t}")
         diff_str = stars(avg_diff) if avg_diff else "   "
@@ -616,9 +823,9 @@ def cmd_topics(qs: list) -> None:
 # ---------------------------------------------------------------------------
 
 MENU = f"""
-{BOLD}{'═' * 44}{RESET}
-{BOLD}  Magyar Exam — Question Editor{RESET}
-{BOLD}{'═' * 44}{RESET}
+{_RULE_EQ}
+{_TITLE}
+{_RULE_EQ}
   {BOLD}[L]{RESET} List all questions
   {BOLD}[S]{RESET} Search questions
   {BOLD}[A]{RESET} Add new question
@@ -626,7 +833,7 @@ MENU = f"""
   {BOLD}[D]{RESET} Delete a question
   {BOLD}[T]{RESET} Topic summary
   {BOLD}[Q]{RESET} Quit
-{BOLD}{'═' * 44}{RESET}"""
+{_RULE_EQ}"""
 
 
 def main() -> None:
@@ -664,7 +871,6 @@ def main() -> None:
             sys.exit(0)
         else:
             print(f"\n  {YELLOW}Unknown option '{choice}'. Press L/S/A/E/D/T/Q.{RESET}")
-            import time
             time.sleep(0.8)
 
 
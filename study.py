@@ -20,13 +20,25 @@ import json
 import random
 import datetime
 import difflib
-import argparse
+import functools
 import os
 import time
 import sys
 import hashlib
 import signal
 import io
+from collections import Counter, deque
+from heapq import nsmallest
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process  # optional: C++ fuzzy matching
+except ImportError:
+    _rf_fuzz = _rf_process = None
+
+try:
+    import orjson  # optional: faster progress.json encode/decode
+except ImportError:
+    orjson = None
 
 # Fix Windows console encoding for Hungarian characters and Unicode symbols
 if sys.platform == "win32":
@@ -43,8 +55,11 @@ if sys.platform == "win32":
 # Constants
 # ---------------------------------------------------------------------------
 
-QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.json")
-PROGRESS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "progress.json")
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTIONS_FILE = os.path.join(_BASE_DIR, "questions.json")
+PROGRESS_FILE = os.path.join(_BASE_DIR, "progress.json")
+# Set PROGRESS_PRETTY=1 to write progress.json indented (for debugging)
+PROGRESS_PRETTY = bool(os.environ.get("PROGRESS_PRETTY"))
 
 TOPIC_NAMES = {
     1: "Nemzeti jelkepek es unnepek",
@@ -84,6 +99,28 @@ BG_GREEN = "\033[42m"
 BG_RED = "\033[41m"
 BG_YELLOW = "\033[43m"
 
+# Pre-built output templates for the per-question screens (the color codes
+# never change, so they are concatenated once here instead of per print)
+Q_HEADER_FMT = "\n  " + BOLD + "[Q {num}/{total}]" + RESET + " Topic {topic} - {label} " + YELLOW + "{stars}" + RESET
+HU_QUESTION_PREFIX = f"  {CYAN}\U0001f1ed\U0001f1fa "
+HU_ANSWER_PREFIX = f"  {GREEN}\U0001f1ed\U0001f1fa "
+EN_LINE_PREFIX = f"  {DIM}\U0001f1ec\U0001f1e7 "
+
+# Score color for each whole percentage 0-100: red below 30, yellow below 60
+_PCT_COLORS = tuple(RED if p < 30 else YELLOW if p < 60 else GREEN for p in range(101))
+
+# Every 20-cell accuracy bar show_stats can draw, keyed by (color, filled cells)
+_BARS = {
+    (color, n): f"{color}{'█' * n}{DIM}{'░' * (20 - n)}{RESET}"
+    for color in (RED, YELLOW, GREEN)
+    for n in range(21)
+}
+_EMPTY_BAR = f"{DIM}{'░' * 20}{RESET}"
+_PASSED = f"{GREEN}PASSED{RESET}"
+_FAILED = f"{RED}FAILED{RESET}"
+EXAM_HISTORY_FMT = "    {date} -- {points:.1f}/30 pts -- {status}"
+MISSED_LINE_FMT = "    " + RED + "{pct:.0f}%" + RESET + " -- [Topic {topic}] {text}"
+
 # Accent map for normalization
 ACCENT_MAP = str.maketrans({
     "\u00e1": "a", "\u00c1": "A",
@@ -103,6 +140,11 @@ ACCENT_MAP = str.maketrans({
 
 _current_progress = None
 _progress_dirty = False
+_last_save_time = 0.0  # time.monotonic() of the last successful save
+
+# Topic -> questions index for the list returned by load_questions()
+_indexed_questions = None
+_topic_index = {}
 
 
 def _signal_handler(sig, frame):
@@ -130,35 +172,121 @@ def clear_screen():
         os.system("clear")
 
 
+@functools.lru_cache(maxsize=8192)
 def normalize_text(text):
     """Remove accents and lowercase text for comparison purposes."""
+    if text.isascii():
+        return text.lower().strip()  # nothing for ACCENT_MAP to replace
     return text.translate(ACCENT_MAP).lower().strip()
 
 
+@functools.lru_cache(maxsize=8192)
 def question_id(question_hu):
-    """Generate a stable ID for a question using MD5 hash of the Hungarian text."""
+    """Generate a stable ID for a question: 64-bit BLAKE2b of the Hungarian text."""
+    return hashlib.blake2b(question_hu.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _legacy_question_id(question_hu):
+    """The pre-BLAKE2b question ID (MD5 hex), used only to migrate progress."""
     return hashlib.md5(question_hu.encode("utf-8")).hexdigest()
 
 
+def similarity(a, b):
+    """Return a 0.0-1.0 similarity ratio (rapidfuzz when installed, else difflib)."""
+    if _rf_fuzz is not None:
+        return _rf_fuzz.ratio(a, b) / 100.0
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _length_bound(len_a, len_b):
+    """Upper bound on similarity() for strings of these lengths."""
+    total = len_a + len_b
+    return 2.0 * min(len_a, len_b) / total if total else 1.0
+
+
+def _close_to(target, threshold):
+    """
+    Return a predicate ``chunk -> bool`` testing similarity(chunk, target) >= threshold.
+
+    Cheap upper bounds are checked first so most chunks never reach the full
+    ratio. The difflib fallback reuses one SequenceMatcher whose second
+    sequence (the target) is analysed only once.
+    """
+    target_len = len(target)
+
+    if _rf_fuzz is not None:
+        def check(chunk):
+            if _length_bound(len(chunk), target_len) < threshold:
+                return False
+            return similarity(chunk, target) >= threshold
+        return check
+
+    matcher = difflib.SequenceMatcher(None, "", target)
+
+    def check(chunk):
+        matcher.set_seq1(chunk)
+        return (
+            matcher.real_quick_ratio() >= threshold
+            and matcher.quick_ratio() >= threshold
+            and matcher.ratio() >= threshold
+        )
+    return check
+
+
+def _window_starts(text, target, size, threshold):
+    """
+    Yield start offsets of the *size*-character windows of *text* that can
+    still reach *threshold* against *target*.
+
+    The bound is difflib's quick_ratio() (shared character counts), kept up
+    to date as the window slides, so skipped windows could never have passed.
+    """
+    need = {}
+    for ch in target:
+        need[ch] = need.get(ch, 0) + 1
+    have = {}
+    shared = 0
+    length = size + len(target)
+    for i, ch in enumerate(text):
+        count = have.get(ch, 0) + 1
+        have[ch] = count
+        if count <= need.get(ch, 0):
+            shared += 1
+        start = i - size + 1
+        if start < 0:
+            continue
+        if 2.0 * shared / length >= threshold:
+            yield start
+        out = text[start]
+        count = have[out]
+        if count <= need.get(out, 0):
+            shared -= 1
+        have[out] = count - 1
+
+
 def fuzzy_match_keyword(user_input, keyword, threshold=0.75):
     """
     Check whether *keyword* appears in *user_input* using fuzzy matching.
 
     Strategy:
     1. Exact substring match (after accent-normalisation) -- instant pass.
-    2. Sliding-window fuzzy match using difflib.SequenceMatcher.
+    2. Sliding-window fuzzy match using similarity() (rapidfuzz or difflib).
        The window slides over the user input in word-sized chunks and also
        in character-sized chunks equal to the keyword length +/- 3.
 
     Returns True if a sufficiently close match is found.
     """
-    norm_input = normalize_text(user_input)
-    norm_kw = normalize_text(keyword)
+    return _match_normalized(normalize_text(user_input), normalize_text(keyword), threshold)
+
 
+def _match_normalized(norm_input, norm_kw, threshold):
+    """fuzzy_match_keyword() on already-normalized input and keyword."""
     # Exact substring
     if norm_kw in norm_input:
         return True
 
+    is_close = _close_to(norm_kw, threshold)
+
     # Word-level check
     input_words = norm_input.split()
     kw_words = norm_kw.split()
@@ -166,34 +294,47 @@ def fuzzy_match_keyword(user_input, keyword, threshold=0.75):
     # Single-word keyword: check against each input word
     if len(kw_words) == 1:
         for word in input_words:
-            ratio = difflib.SequenceMatcher(None, word, norm_kw).ratio()
-            if ratio >= threshold:
+            if is_close(word):
                 return True
 
     # Multi-word keyword: sliding window of same word count
     if len(kw_words) > 1:
         for i in range(len(input_words) - len(kw_words) + 1):
             window = " ".join(input_words[i : i + len(kw_words)])
-            ratio = difflib.SequenceMatcher(None, window, norm_kw).ratio()
-            if ratio >= threshold:
+            if is_close(window):
                 return True
 
     # Character-level sliding window
     kw_len = len(norm_kw)
-    for window_size in range(max(1, kw_len - 3), kw_len + 4):
-        for i in range(len(norm_input) - window_size + 1):
-            chunk = norm_input[i : i + window_size]
-            ratio = difflib.SequenceMatcher(None, chunk, norm_kw).ratio()
-            if ratio >= threshold:
+    window_sizes = [
+        size for size in range(max(1, kw_len - 3), kw_len + 4)
+        # no chunk of a size failing the length bound can reach the threshold
+        if _length_bound(size, kw_len) >= threshold
+    ]
+    if _rf_process is not None:
+        # Score every window in one C call; same windows, same ratio as below
+        chunks = [
+            norm_input[i : i + size]
+            for size in window_sizes
+            for i in range(len(norm_input) - size + 1)
+        ]
+        best = _rf_process.extractOne(norm_kw, chunks, scorer=_rf_fuzz.ratio)
+        return best is not None and best[1] / 100.0 >= threshold
+    for window_size in window_sizes:
+        for i in _window_starts(norm_input, norm_kw, window_size, threshold):
+            if is_close(norm_input[i : i + window_size]):
                 return True
 
     return False
 
 
-def score_answer(user_input, keywords):
+def score_answer(user_input, keywords, keywords_norm=None):
     """
     Score the user's answer against the list of expected keywords.
 
+    *keywords_norm* may carry the keywords already passed through
+    normalize_text() (see the ``_keywords_norm`` field set by load_questions).
+
     Returns:
         (score, matched_list, missed_list)
         where score is a float between 0.0 and 1.0
@@ -201,11 +342,15 @@ def score_answer(user_input, keywords):
     if not keywords:
         return (1.0, [], [])
 
+    if keywords_norm is None:
+        keywords_norm = [normalize_text(kw) for kw in keywords]
+    norm_input = normalize_text(user_input)
+
     matched = []
     missed = []
 
-    for kw in keywords:
-        if fuzzy_match_keyword(user_input, kw):
+    for kw, norm_kw in zip(keywords, keywords_norm):
+        if _match_normalized(norm_input, norm_kw, 0.75):
             matched.append(kw)
         else:
             missed.append(kw)
@@ -242,12 +387,21 @@ def load_questions(filepath):
         # Ensure keywords_hu is a list
         if isinstance(q["keywords_hu"], str):
             q["keywords_hu"] = [k.strip() for k in q["keywords_hu"].split(",") if k.strip()]
+        # Keywords never change after load -- normalize them once here
+        q["_keywords_norm"] = tuple(normalize_text(k) for k in q["keywords_hu"])
+        q["_qid"] = question_id(q["question_hu"])
         valid.append(q)
 
     if not valid:
         print(f"{RED}Error: No valid questions found in {filepath}.{RESET}")
         sys.exit(1)
 
+    global _indexed_questions, _topic_index
+    _topic_index = {}
+    for q in valid:
+        _topic_index.setdefault(q["topic"], []).append(q)
+    _indexed_questions = valid
+
     return valid
 
 
@@ -255,12 +409,19 @@ def load_progress(filepath):
     """Load progress from JSON file, or return a fresh structure."""
     if os.path.isfile(filepath):
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(filepath, "rb") as f:
+                raw = f.read()
+            if not raw.strip():
+                # Empty file (e.g. created by hand): nothing to parse or warn about
+                return {"sessions": [], "questions": {}, "vocab": {}}
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             # Ensure expected keys
             data.setdefault("sessions", [])
             data.setdefault("questions", {})
             data.setdefault("vocab", {})
+            _migrate_question_ids(data)
+            _fill_entry_defaults(data)
             return data
         except (json.JSONDecodeError, KeyError):
             print(f"{YELLOW}Warning: progress.json was corrupted -- starting fresh.{RESET}")
@@ -268,21 +429,111 @@ def load_progress(filepath):
     return {"sessions": [], "questions": {}, "vocab": {}}
 
 
-def save_progress(progress, filepath):
-    """Save progress to JSON file."""
+def _migrate_question_ids(progress):
+    """
+    Re-key progress written with the old 32-char MD5 question IDs.
+
+    Keys are mapped through the loaded question bank, so SRS entries (written
+    by the TUI without a question entry of their own) are re-keyed too;
+    question entries for questions no longer in the bank fall back to their
+    stored ``question_hu`` text. Keys that cannot be mapped are left untouched.
+    """
     global _progress_dirty
+    remap = {}
+    if _indexed_questions:
+        remap = {_legacy_question_id(q["question_hu"]): q["_qid"] for q in _indexed_questions}
+    q_data = progress["questions"]
+    for key, entry in q_data.items():
+        if len(key) != 32 or key in remap:
+            continue
+        text = entry.get("question_hu") if isinstance(entry, dict) else None
+        if text and _legacy_question_id(text) == key:
+            remap[key] = question_id(text)
+
+    changed = False
+    for section in ("questions", "srs"):
+        data = progress.get(section)
+        if isinstance(data, dict) and any(k in remap for k in data):
+            progress[section] = {remap.get(k, k): v for k, v in data.items()}
+            changed = True
+    if changed:
+        _progress_dirty = True
+
+
+def _fill_entry_defaults(progress):
+    """
+    Give every question and vocab entry the counters record_attempt() and
+    record_vocab_attempt() always write, so readers can index them directly.
+    """
+    for entry in progress["questions"].values():
+        attempts = entry.setdefault("attempts", 0)
+        correct = entry.setdefault("correct", 0)
+        if "accuracy" not in entry:
+            entry["accuracy"] = correct / attempts if attempts else 0.0
+    for entry in progress["vocab"].values():
+        entry.setdefault("attempts", 0)
+        entry.setdefault("correct", 0)
+
+
+def encode_progress(progress):
+    """Serialise progress to the bytes save_progress() writes."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if PROGRESS_PRETTY:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(progress, option=option)
+    if PROGRESS_PRETTY:
+        return json.dumps(progress, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(
+        progress, ensure_ascii=False, separators=(",", ":"), check_circular=False
+    ).encode("utf-8")
+
+
+def write_progress(payload, filepath):
+    """
+    Write already-encoded progress bytes to *filepath*.
+
+    The data is written to a temporary file and moved into place with
+    os.replace, so an interrupted save never leaves a truncated file behind.
+    OSError propagates to the caller; progress stays dirty in that case.
+    """
+    global _progress_dirty, _last_save_time
+    tmp = filepath + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, filepath)
+    _progress_dirty = False
+    _last_save_time = time.monotonic()
+
+
+def save_progress(progress, filepath):
+    """Save progress to JSON file (see write_progress); return True on success."""
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2, ensure_ascii=False)
-        _progress_dirty = False
+        write_progress(encode_progress(progress), filepath)
     except OSError as exc:
         print(f"{RED}Error saving progress: {exc}{RESET}")
+        return False
+    return True
+
+
+def maybe_save_progress(progress, filepath=None, min_interval=5.0):
+    """Save progress if it is dirty and the last save is at least *min_interval* seconds old."""
+    if _progress_dirty and time.monotonic() - _last_save_time >= min_interval:
+        save_progress(progress, filepath or PROGRESS_FILE)
+
+
+def now_iso():
+    """Current local time as an ISO-8601 string, to the second."""
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
 
+def record_attempt(progress, q, score, now=None):
+    """Record an attempt on a question in progress data.
 
-def record_attempt(progress, q, score):
-    """Record an attempt on a question in progress data."""
+    *now* is an optional now_iso() timestamp, for callers recording a batch.
+    """
     global _progress_dirty
-    qid = question_id(q["question_hu"])
+    qid = q["_qid"]
     entry = progress["questions"].setdefault(qid, {
         "attempts": 0,
         "correct": 0,
@@ -294,16 +545,16 @@ def record_attempt(progress, q, score):
     entry["attempts"] += 1
     if score >= 0.6:
         entry["correct"] += 1
-    entry["last_seen"] = datetime.datetime.now().isoformat()
+    entry["last_seen"] = now or now_iso()
     entry["accuracy"] = entry["correct"] / entry["attempts"]
     _progress_dirty = True
 
 
-def record_session(progress, mode, score, total, topic=None):
-    """Record a study session."""
+def record_session(progress, mode, score, total, topic=None, now=None):
+    """Record a study session (*now* as in record_attempt)."""
     global _progress_dirty
     session = {
-        "date": datetime.datetime.now().isoformat(),
+        "date": now or now_iso(),
         "mode": mode,
         "score": score,
         "total": total,
@@ -324,19 +575,31 @@ def record_vocab_attempt(progress, word, correct):
     _progress_dirty = True
 
 
+HEADER_RULE = f"{BOLD}{CYAN}{'=' * 60}{RESET}"
+
+
+def header_lines(title):
+    """Return the output lines of a formatted section header."""
+    return ["", HEADER_RULE, f"{BOLD}{CYAN}  {title}{RESET}", HEADER_RULE, ""]
+
+
 def print_header(title):
     """Print a formatted section header."""
-    width = 60
-    print()
-    print(f"{BOLD}{CYAN}{'=' * width}{RESET}")
-    print(f"{BOLD}{CYAN}  {title}{RESET}")
-    print(f"{BOLD}{CYAN}{'=' * width}{RESET}")
-    print()
+    write_lines(header_lines(title))
 
 
-def print_divider():
-    """Print a thin divider line."""
-    print(f"{DIM}{'─' * 60}{RESET}")
+DIVIDER = f"{DIM}{'─' * 60}{RESET}"
+
+
+def pct_color(pct):
+    """ANSI color for a 0-100 score percentage."""
+    return _PCT_COLORS[min(int(pct), 100)]
+
+
+def write_lines(lines):
+    """Write a block of output lines with a single write + flush."""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def format_time(seconds):
@@ -354,7 +617,9 @@ def get_input(prompt=""):
 
 
 def get_questions_for_topic(questions, topic):
-    """Filter questions by topic number."""
+    """Filter questions by topic number (returns a new list the caller may shuffle)."""
+    if questions is _indexed_questions:
+        return list(_topic_index.get(topic, ()))
     return [q for q in questions if q["topic"] == topic]
 
 
@@ -381,30 +646,33 @@ def mode_learn(questions, progress, topic):
     print(f"  {total} questions to review. Press {BOLD}Enter{RESET} to advance, {BOLD}'q'{RESET} to quit.\n")
 
     for idx, q in enumerate(topic_qs):
-        print_divider()
         stars = DIFFICULTY_STARS.get(q.get("difficulty", 1), "\u2605")
-        print(f"\n  {BOLD}[Q {idx + 1}/{total}]{RESET} Topic {topic} - {topic_label} {YELLOW}{stars}{RESET}")
-        print(f"  {CYAN}\U0001f1ed\U0001f1fa {q['question_hu']}{RESET}")
-        print(f"  {DIM}\U0001f1ec\U0001f1e7 {q['question_en']}{RESET}")
-        print()
+        write_lines([
+            DIVIDER,
+            Q_HEADER_FMT.format(num=idx + 1, total=total, topic=topic, label=topic_label, stars=stars),
+            HU_QUESTION_PREFIX + q["question_hu"] + RESET,
+            EN_LINE_PREFIX + q["question_en"] + RESET,
+            "",
+        ])
 
         resp = get_input(f"  {DIM}Press Enter to reveal answer...{RESET}")
         if resp is None or resp.strip().lower() == "q":
             break
 
-        print()
-        print(f"  {GREEN}\U0001f1ed\U0001f1fa {q['answer_hu']}{RESET}")
-        print(f"  {DIM}\U0001f1ec\U0001f1e7 {q['answer_en']}{RESET}")
-
+        out = [
+            "",
+            HU_ANSWER_PREFIX + q["answer_hu"] + RESET,
+            EN_LINE_PREFIX + q["answer_en"] + RESET,
+        ]
         if q.get("keywords_hu"):
             kws = q["keywords_hu"]
             if isinstance(kws, list):
                 kw_str = ", ".join(kws)
             else:
                 kw_str = kws
-            print(f"  {MAGENTA}Keywords: {kw_str}{RESET}")
-
-        print()
+            out.append(f"  {MAGENTA}Keywords: {kw_str}{RESET}")
+        out.append("")
+        write_lines(out)
         resp = get_input(f"  {DIM}Enter = next | q = quit: {RESET}")
         if resp is None or resp.strip().lower() == "q":
             break
@@ -432,16 +700,17 @@ def run_quiz(questions_list, progress, mode_name="quiz", topic=None, show_timer=
     total_score = 0.0
 
     for idx, q in enumerate(questions_list):
-        print_divider()
+        out = [DIVIDER]
 
         # Timer display for exam mode
         if show_timer and exam_start is not None and exam_duration is not None:
             elapsed = time.time() - exam_start
             remaining = max(0, exam_duration - elapsed)
             timer_color = GREEN if remaining > 600 else (YELLOW if remaining > 120 else RED)
-            print(f"\n  {timer_color}Time remaining: {format_time(remaining)}{RESET}")
+            out.append(f"\n  {timer_color}Time remaining: {format_time(remaining)}{RESET}")
             if remaining <= 0:
-                print(f"\n  {RED}{BOLD}TIME IS UP!{RESET}")
+                out.append(f"\n  {RED}{BOLD}TIME IS UP!{RESET}")
+                write_lines(out)
                 # Score remaining questions as 0
                 record_session(progress, mode_name, total_score, total, topic)
                 save_progress(progress, PROGRESS_FILE)
@@ -451,10 +720,13 @@ def run_quiz(questions_list, progress, mode_name="quiz", topic=None, show_timer=
         topic_num = q.get("topic", "?")
         topic_label = TOPIC_NAMES_HU.get(topic_num, f"Topic {topic_num}")
 
-        print(f"\n  {BOLD}[Q {idx + 1}/{total}]{RESET} Topic {topic_num} - {topic_label} {YELLOW}{stars}{RESET}")
-        print(f"  {CYAN}\U0001f1ed\U0001f1fa {q['question_hu']}{RESET}")
-        print(f"  {DIM}\U0001f1ec\U0001f1e7 {q['question_en']}{RESET}")
-        print()
+        out += [
+            Q_HEADER_FMT.format(num=idx + 1, total=total, topic=topic_num, label=topic_label, stars=stars),
+            HU_QUESTION_PREFIX + q["question_hu"] + RESET,
+            EN_LINE_PREFIX + q["question_en"] + RESET,
+            "",
+        ]
+        write_lines(out)
 
         user_answer = get_input(f"  {BOLD}Your answer (Hungarian): {RESET}")
         if user_answer is None:
@@ -462,15 +734,11 @@ def run_quiz(questions_list, progress, mode_name="quiz", topic=None, show_timer=
         if user_answer.strip().lower() == "q":
             break
 
-        keywords = q.get("keywords_hu", [])
-        if isinstance(keywords, str):
-            keywords = [k.strip() for k in keywords.split(",") if k.strip()]
-
-        sc, matched, missed = score_answer(user_answer, keywords)
+        sc, matched, missed = score_answer(user_answer, q["keywords_hu"], q["_keywords_norm"])
         total_score += sc
         record_attempt(progress, q, sc)
+        maybe_save_progress(progress)
 
-        print()
         # Feedback
         if sc >= 0.6:
             icon = f"{GREEN}\u2714{RESET}"
@@ -483,30 +751,37 @@ def run_quiz(questions_list, progress, mode_name="quiz", topic=None, show_timer=
             label = f"{RED}Incorrect{RESET}"
 
         pct = int(sc * 100)
-        print(f"  {icon} {label} ({pct}% keyword match)")
-        print()
-        print(f"  {GREEN}Correct answer:{RESET}")
-        print(f"  {GREEN}\U0001f1ed\U0001f1fa {q['answer_hu']}{RESET}")
-        print(f"  {DIM}\U0001f1ec\U0001f1e7 {q['answer_en']}{RESET}")
-        print()
-
+        out = [
+            "",
+            f"  {icon} {label} ({pct}% keyword match)",
+            "",
+            f"  {GREEN}Correct answer:{RESET}",
+            HU_ANSWER_PREFIX + q["answer_hu"] + RESET,
+            EN_LINE_PREFIX + q["answer_en"] + RESET,
+            "",
+        ]
         if matched:
-            print(f"  {GREEN}\u2714 Matched: {', '.join(matched)}{RESET}")
+            out.append(f"  {GREEN}\u2714 Matched: {', '.join(matched)}{RESET}")
         if missed:
-            print(f"  {RED}\u2718 Missed:  {', '.join(missed)}{RESET}")
-
-        print()
+            out.append(f"  {RED}\u2718 Missed:  {', '.join(missed)}{RESET}")
+        out.append("")
+        write_lines(out)
 
     return (total_score, total)
 
 
-def mode_quiz(questions, progress, topic):
-    """Quiz mode for a specific topic."""
+def mode_quiz(questions, progress, topic, limit=None):
+    """Quiz mode for a specific topic, optionally capped at *limit* random questions."""
     topic_qs = get_questions_for_topic(questions, topic)
     if not topic_qs:
         print(f"{RED}No questions found for topic {topic}.{RESET}")
         return
 
+    if limit is not None and limit < len(topic_qs):
+        topic_qs = random.sample(topic_qs, limit)  # draws only what will be asked
+    else:
+        random.shuffle(topic_qs)
+
     topic_label = TOPIC_NAMES_HU.get(topic, f"Topic {topic}")
 
     clear_screen()
@@ -514,14 +789,12 @@ def mode_quiz(questions, progress, topic):
     print(f"  {len(topic_qs)} questions. Type your answer in Hungarian.")
     print(f"  Type {BOLD}'q'{RESET} to quit early.\n")
 
-    random.shuffle(topic_qs)
     total_score, total = run_quiz(topic_qs, progress, mode_name="quiz", topic=topic)
 
     # Summary
-    print_divider()
-    print_header("Quiz Results")
+    write_lines([DIVIDER, *header_lines("Quiz Results")])
     pct = (total_score / total * 100) if total > 0 else 0
-    color = GREEN if pct >= 60 else (YELLOW if pct >= 30 else RED)
+    color = pct_color(pct)
     print(f"  Score: {color}{total_score:.1f} / {total} ({pct:.0f}%){RESET}")
     if pct >= 80:
         print(f"  {GREEN}Excellent work! Kiv\u00e1l\u00f3!{RESET}")
@@ -552,7 +825,7 @@ def mode_weak(questions, progress):
 
     # Gather weak questions
     weak_qs = []
-    all_qids = {question_id(q["question_hu"]): q for q in questions}
+    all_qids = {q["_qid"]: q for q in questions}
 
     # Find questions with bad accuracy
     for qid, q in all_qids.items():
@@ -560,7 +833,7 @@ def mode_weak(questions, progress):
         if entry is None:
             # Never attempted
             weak_qs.append((0.0, q))
-        elif entry.get("accuracy", 0) < 0.6:
+        elif entry["accuracy"] < 0.6:
             weak_qs.append((entry["accuracy"], q))
 
     if not weak_qs:
@@ -577,10 +850,9 @@ def mode_weak(questions, progress):
 
     total_score, total = run_quiz(weak_questions, progress, mode_name="weak")
 
-    print_divider()
-    print_header("Weak Spots Review Results")
+    write_lines([DIVIDER, *header_lines("Weak Spots Review Results")])
     pct = (total_score / total * 100) if total > 0 else 0
-    color = GREEN if pct >= 60 else (YELLOW if pct >= 30 else RED)
+    color = pct_color(pct)
     print(f"  Score: {color}{total_score:.1f} / {total} ({pct:.0f}%){RESET}\n")
 
     record_session(progress, "weak", total_score, total)
@@ -642,8 +914,7 @@ def mode_exam(questions, progress):
     points = (total_score / total * 30) if total > 0 else 0
     passed = points >= 16
 
-    print_divider()
-    print_header("Exam Results")
+    write_lines([DIVIDER, *header_lines("Exam Results")])
 
     print(f"  Time used: {format_time(elapsed)} / 60:00")
     print()
@@ -679,10 +950,8 @@ def mode_vocab(questions, progress, topic=None):
     clear_screen()
     print_header("Vocabulary Drill -- Sz\u00f3kincs Gyakorl\u00e1s")
 
-    # Collect vocab pairs: (hungarian_keyword, english_context, question_context)
-    vocab_pairs = []
-    seen_keywords = set()
-
+    # Collect vocab pairs: (hungarian_keyword, english_context, question_context),
+    # one per normalized keyword (first occurrence wins; dicts keep insertion order)
     filtered = questions
     if topic is not None:
         filtered = get_questions_for_topic(questions, topic)
@@ -690,22 +959,32 @@ def mode_vocab(questions, progress, topic=None):
             print(f"{RED}No questions found for topic {topic}.{RESET}")
             return
 
+    by_norm = {}
     for q in filtered:
-        keywords = q.get("keywords_hu", [])
-        if isinstance(keywords, str):
-            keywords = [k.strip() for k in keywords.split(",") if k.strip()]
-
-        for kw in keywords:
-            norm = normalize_text(kw)
-            if norm not in seen_keywords:
-                seen_keywords.add(norm)
-                vocab_pairs.append({
+        # Significant English words (normalized) accepted in round 2
+        answer_words = tuple(
+            normalize_text(w) for w in q["answer_en"].split() if len(w) > 3
+        )
+        question_words = tuple(
+            normalize_text(w) for w in q["question_en"].split() if len(w) > 3
+        )
+        for kw, norm in zip(q["keywords_hu"], q["_keywords_norm"]):
+            if norm not in by_norm:
+                by_norm[norm] = {
                     "keyword_hu": kw,
                     "question_en": q["question_en"],
                     "answer_en": q["answer_en"],
                     "answer_hu": q["answer_hu"],
                     "topic": q["topic"],
-                })
+                    # progress["vocab"] keys for the two drill directions
+                    "_key_hu": kw,
+                    "_key_en": kw + "_en",
+                    "_answer_words": answer_words,
+                    "_answer_tokens": frozenset(answer_words),
+                    "_question_words": question_words,
+                    "_question_tokens": frozenset(question_words),
+                }
+    vocab_pairs = list(by_norm.values())
 
     if not vocab_pairs:
         print(f"{RED}No vocabulary words found.{RESET}")
@@ -726,11 +1005,13 @@ def mode_vocab(questions, progress, topic=None):
     print(f"  Given the English context, type the Hungarian keyword.\n")
 
     for idx, vp in enumerate(vocab_pairs):
-        print_divider()
-        print(f"\n  {BOLD}[{idx + 1}/{total_cards}]{RESET}")
-        print(f"  {CYAN}Context: {vp['question_en']}{RESET}")
-        print(f"  {DIM}Answer context: {vp['answer_en']}{RESET}")
-        print()
+        write_lines([
+            DIVIDER,
+            f"\n  {BOLD}[{idx + 1}/{total_cards}]{RESET}",
+            f"  {CYAN}Context: {vp['question_en']}{RESET}",
+            f"  {DIM}Answer context: {vp['answer_en']}{RESET}",
+            "",
+        ])
 
         user_input = get_input(f"  {BOLD}Hungarian keyword: {RESET}")
         if user_input is None or user_input.strip().lower() == "q":
@@ -741,12 +1022,13 @@ def mode_vocab(questions, progress, topic=None):
 
         if is_match:
             correct_count += 1
-            print(f"  {GREEN}\u2714 Correct! -- {vp['keyword_hu']}{RESET}")
-            record_vocab_attempt(progress, vp["keyword_hu"], True)
+            feedback = f"  {GREEN}\u2714 Correct! -- {vp['keyword_hu']}{RESET}"
+            record_vocab_attempt(progress, vp["_key_hu"], True)
         else:
-            print(f"  {RED}\u2718 Expected: {vp['keyword_hu']}{RESET}")
-            record_vocab_attempt(progress, vp["keyword_hu"], False)
-        print()
+            feedback = f"  {RED}\u2718 Expected: {vp['keyword_hu']}{RESET}"
+            record_vocab_attempt(progress, vp["_key_hu"], False)
+        maybe_save_progress(progress)
+        write_lines([feedback, ""])
 
     # Round 2: Hungarian keyword -> English meaning
     print_header("Round 2: Hungarian -> English")
@@ -755,10 +1037,12 @@ def mode_vocab(questions, progress, topic=None):
     random.shuffle(vocab_pairs)
 
     for idx, vp in enumerate(vocab_pairs):
-        print_divider()
-        print(f"\n  {BOLD}[{idx + 1}/{total_cards}]{RESET}")
-        print(f"  {CYAN}Hungarian keyword: {vp['keyword_hu']}{RESET}")
-        print()
+        write_lines([
+            DIVIDER,
+            f"\n  {BOLD}[{idx + 1}/{total_cards}]{RESET}",
+            f"  {CYAN}Hungarian keyword: {vp['keyword_hu']}{RESET}",
+            "",
+        ])
 
         user_input = get_input(f"  {BOLD}English meaning: {RESET}")
         if user_input is None or user_input.strip().lower() == "q":
@@ -767,49 +1051,53 @@ def mode_vocab(questions, progress, topic=None):
         total_attempts += 1
         # For English direction, check if user's answer is somewhat close
         # to the English answer context using fuzzy matching
-        # We accept if any significant word from answer_en appears
-        answer_words = [w for w in vp["answer_en"].split() if len(w) > 3]
-        matched_any = False
-        for aw in answer_words:
-            if fuzzy_match_keyword(user_input, aw, threshold=0.7):
-                matched_any = True
-                break
-
-        # Also check question context
+        # We accept if any significant word from answer_en (or, failing
+        # that, question_en) appears. A word typed verbatim is an exact
+        # match, so try plain set intersection before any fuzzy matching.
+        norm_input = normalize_text(user_input)
+        input_tokens = set(norm_input.split())
+        matched_any = bool(
+            input_tokens & vp["_answer_tokens"]
+            or input_tokens & vp["_question_tokens"]
+        )
         if not matched_any:
-            q_words = [w for w in vp["question_en"].split() if len(w) > 3]
-            for qw in q_words:
-                if fuzzy_match_keyword(user_input, qw, threshold=0.7):
+            for w in vp["_answer_words"] + vp["_question_words"]:
+                if _match_normalized(norm_input, w, 0.7):
                     matched_any = True
                     break
 
         if matched_any:
             correct_count += 1
-            print(f"  {GREEN}\u2714 Good!{RESET}")
-            record_vocab_attempt(progress, vp["keyword_hu"] + "_en", True)
+            feedback = f"  {GREEN}\u2714 Good!{RESET}"
+            record_vocab_attempt(progress, vp["_key_en"], True)
         else:
-            print(f"  {YELLOW}~ The full context:{RESET}")
-            record_vocab_attempt(progress, vp["keyword_hu"] + "_en", False)
+            feedback = f"  {YELLOW}~ The full context:{RESET}"
+            record_vocab_attempt(progress, vp["_key_en"], False)
+        maybe_save_progress(progress)
 
-        print(f"  {DIM}Q: {vp['question_en']}{RESET}")
-        print(f"  {DIM}A: {vp['answer_en']}{RESET}")
-        print()
+        write_lines([
+            feedback,
+            f"  {DIM}Q: {vp['question_en']}{RESET}",
+            f"  {DIM}A: {vp['answer_en']}{RESET}",
+            "",
+        ])
 
     # Summary
-    print_divider()
-    print_header("Vocab Drill Results")
+    write_lines([DIVIDER, *header_lines("Vocab Drill Results")])
     pct = (correct_count / total_attempts * 100) if total_attempts > 0 else 0
-    color = GREEN if pct >= 60 else (YELLOW if pct >= 30 else RED)
+    color = pct_color(pct)
     print(f"  Score: {color}{correct_count} / {total_attempts} ({pct:.0f}%){RESET}")
 
     # Show mastered vs unmastered words
     mastered = 0
+    vocab_data = progress["vocab"]
     for vp in vocab_pairs:
-        entry = progress["vocab"].get(vp["keyword_hu"], {})
-        if entry.get("attempts", 0) > 0:
-            acc = entry.get("correct", 0) / entry["attempts"]
-            if acc >= 0.8 and entry["attempts"] >= 2:
-                mastered += 1
+        entry = vocab_data.get(vp["_key_hu"])
+        if entry is None:
+            continue
+        att = entry["attempts"]
+        if att >= 2 and entry["correct"] / att >= 0.8:
+            mastered += 1
 
     print(f"  Mastered words: {GREEN}{mastered}{RESET} / {total_cards}")
     print()
@@ -826,22 +1114,38 @@ def mode_vocab(questions, progress, topic=None):
 def show_stats(questions, progress):
     """Display comprehensive study statistics."""
     clear_screen()
-    print_header("Study Statistics -- Tanul\u00e1si Statisztika")
+    # The whole report is collected here and written in one go at the end
+    out = header_lines("Study Statistics -- Tanul\u00e1si Statisztika")
+    app = out.append
 
     sessions = progress.get("sessions", [])
     q_data = progress.get("questions", {})
     vocab_data = progress.get("vocab", {})
+    fromiso = datetime.datetime.fromisoformat  # called once per session below
+
+    # Fresh user: nothing to summarise, just point at the first topic
+    if not (sessions or q_data or vocab_data):
+        label = TOPIC_NAMES_HU.get(1) or "Topic 1"
+        app(f"  {YELLOW}No sessions recorded yet. Start studying!{RESET}")
+        app("")
+        app(DIVIDER)
+        app(f"\n  {BOLD}Recommendation:{RESET}")
+        app(f"    {CYAN}Start with Topic 1: {label} (not attempted yet){RESET}")
+        app("    Run: python study.py --mode learn --topic 1")
+        app("")
+        write_lines(out)
+        return
 
     # ---- Session summary ----
     total_sessions = len(sessions)
-    print(f"  {BOLD}Total study sessions:{RESET} {total_sessions}")
+    app(f"  {BOLD}Total study sessions:{RESET} {total_sessions}")
 
     if sessions:
         # Study streak
         session_dates = set()
         for s in sessions:
             try:
-                dt = datetime.datetime.fromisoformat(s["date"])
+                dt = fromiso(s["date"])
                 session_dates.add(dt.date())
             except (ValueError, KeyError):
                 pass
@@ -858,137 +1162,150 @@ def show_stats(questions, progress):
                 elif d < check_date:
                     break
 
-            print(f"  {BOLD}Current study streak:{RESET} {GREEN}{streak} day(s){RESET}")
-            print(f"  {BOLD}Total unique days studied:{RESET} {len(session_dates)}")
+            app(f"  {BOLD}Current study streak:{RESET} {GREEN}{streak} day(s){RESET}")
+            app(f"  {BOLD}Total unique days studied:{RESET} {len(session_dates)}")
 
         # Last session
         try:
-            last = datetime.datetime.fromisoformat(sessions[-1]["date"])
-            print(f"  {BOLD}Last session:{RESET} {last.strftime('%Y-%m-%d %H:%M')}")
+            last = fromiso(sessions[-1]["date"])
+            app(f"  {BOLD}Last session:{RESET} {last.strftime('%Y-%m-%d %H:%M')}")
         except (ValueError, KeyError):
             pass
     else:
-        print(f"  {YELLOW}No sessions recorded yet. Start studying!{RESET}")
+        app(f"  {YELLOW}No sessions recorded yet. Start studying!{RESET}")
 
     # ---- Per-topic accuracy ----
-    print()
-    print_divider()
-    print(f"\n  {BOLD}Per-Topic Accuracy:{RESET}\n")
-
-    topic_stats = {}
-    for t in range(1, 7):
-        topic_stats[t] = {"attempts": 0, "correct": 0}
+    app("")
+    app(DIVIDER)
+    app(f"\n  {BOLD}Per-Topic Accuracy:{RESET}\n")
 
-    for qid, entry in q_data.items():
+    attempts_by_topic = Counter()
+    correct_by_topic = Counter()
+    for entry in q_data.values():
         t = entry.get("topic")
-        if t and t in topic_stats:
-            topic_stats[t]["attempts"] += entry.get("attempts", 0)
-            topic_stats[t]["correct"] += entry.get("correct", 0)
-
-    recommend_topic = None
-    worst_accuracy = 1.0
+        if t:
+            attempts_by_topic[t] += entry["attempts"]
+            correct_by_topic[t] += entry["correct"]
+
+    # Built in topic order 1-6, so the loops below iterate items() directly
+    topic_stats = {
+        t: {"attempts": attempts_by_topic[t], "correct": correct_by_topic[t]}
+        for t in range(1, 7)
+    }
 
-    for t in range(1, 7):
-        stats = topic_stats[t]
-        label = TOPIC_NAMES_HU.get(t, f"Topic {t}")
-        if stats["attempts"] > 0:
-            acc = stats["correct"] / stats["attempts"]
+    # Recommend the first unattempted topic, else the least accurate one
+    # (only if it is below 100%)
+    not_attempted = True
+    recommend_topic = next((t for t, stats in topic_stats.items() if stats["attempts"] == 0), None)
+    if recommend_topic is None:
+        not_attempted = False
+        weakest, stats = min(topic_stats.items(), key=lambda item: item[1]["correct"] / item[1]["attempts"])
+        if stats["correct"] < stats["attempts"]:
+            recommend_topic = weakest
+
+    recommend_label = None
+    total_attempts = total_correct = 0
+
+    topic_name = TOPIC_NAMES_HU.get
+    for t, stats in topic_stats.items():
+        attempts = stats["attempts"]
+        correct = stats["correct"]
+        total_attempts += attempts
+        total_correct += correct
+        label = topic_name(t) or f"Topic {t}"
+        if t == recommend_topic:
+            recommend_label = label
+        if attempts > 0:
+            acc = correct / attempts
             pct = acc * 100
-            color = GREEN if pct >= 60 else (YELLOW if pct >= 30 else RED)
+            color = pct_color(pct)
             bar_len = int(acc * 20)
-            bar = f"{color}{'█' * bar_len}{DIM}{'░' * (20 - bar_len)}{RESET}"
-            print(f"    Topic {t}: {label}")
-            print(f"    {bar} {color}{pct:.0f}%{RESET} ({stats['correct']}/{stats['attempts']})")
-            print()
-            if acc < worst_accuracy:
-                worst_accuracy = acc
-                recommend_topic = t
+            bar = _BARS[(color, bar_len)]
+            app(f"    Topic {t}: {label}")
+            app(f"    {bar} {color}{pct:.0f}%{RESET} ({correct}/{attempts})")
+            app("")
         else:
-            print(f"    Topic {t}: {label}")
-            print(f"    {DIM}{'░' * 20}{RESET} {YELLOW}Not attempted{RESET}")
-            print()
-            if worst_accuracy > 0:
-                recommend_topic = t
-                worst_accuracy = 0
+            app(f"    Topic {t}: {label}")
+            app(f"    {_EMPTY_BAR} {YELLOW}Not attempted{RESET}")
+            app("")
 
     # ---- Overall readiness ----
-    print_divider()
-    total_attempts = sum(s["attempts"] for s in topic_stats.values())
-    total_correct = sum(s["correct"] for s in topic_stats.values())
-
+    app(DIVIDER)
     if total_attempts > 0:
         overall = total_correct / total_attempts * 100
-        color = GREEN if overall >= 60 else (YELLOW if overall >= 30 else RED)
-        print(f"\n  {BOLD}Overall readiness:{RESET} {color}{overall:.0f}%{RESET}")
+        color = pct_color(overall)
+        app(f"\n  {BOLD}Overall readiness:{RESET} {color}{overall:.0f}%{RESET}")
     else:
-        print(f"\n  {BOLD}Overall readiness:{RESET} {YELLOW}N/A (no attempts yet){RESET}")
+        app(f"\n  {BOLD}Overall readiness:{RESET} {YELLOW}N/A (no attempts yet){RESET}")
 
     # ---- Exam results ----
-    exam_sessions = [s for s in sessions if s.get("mode") == "exam"]
+    # Last 5 exams; the deque drops older ones as it fills
+    exam_sessions = deque((s for s in sessions if s.get("mode") == "exam"), maxlen=5)
     if exam_sessions:
-        print()
-        print_divider()
-        print(f"\n  {BOLD}Mock Exam History:{RESET}\n")
-        for es in exam_sessions[-5:]:  # Last 5 exams
+        app("")
+        app(DIVIDER)
+        app(f"\n  {BOLD}Mock Exam History:{RESET}\n")
+        for es in exam_sessions:
             try:
-                dt = datetime.datetime.fromisoformat(es["date"]).strftime("%Y-%m-%d %H:%M")
+                dt = fromiso(es["date"]).strftime("%Y-%m-%d %H:%M")
             except (ValueError, KeyError):
                 dt = "?"
             pts = es.get("score", 0)
             passed = pts >= 16
-            status = f"{GREEN}PASSED{RESET}" if passed else f"{RED}FAILED{RESET}"
-            print(f"    {dt} -- {pts:.1f}/30 pts -- {status}")
-        print()
+            status = _PASSED if passed else _FAILED
+            app(EXAM_HISTORY_FMT.format(date=dt, points=pts, status=status))
+        app("")
 
     # ---- Most missed questions ----
-    print_divider()
-    print(f"\n  {BOLD}Most Missed Questions:{RESET}\n")
-
-    missed_list = []
-    for qid, entry in q_data.items():
-        if entry.get("attempts", 0) > 0 and entry.get("accuracy", 1.0) < 0.6:
-            missed_list.append(entry)
+    app(DIVIDER)
+    app(f"\n  {BOLD}Most Missed Questions:{RESET}\n")
 
-    missed_list.sort(key=lambda x: x.get("accuracy", 0))
+    # load_progress() / record_attempt() guarantee attempts and accuracy
+    missed_list = [
+        entry for entry in q_data.values()
+        if entry["attempts"] > 0 and entry["accuracy"] < 0.6
+    ]
 
     if missed_list:
-        for m in missed_list[:5]:
-            acc = m.get("accuracy", 0) * 100
-            t = m.get("topic", "?")
-            qtext = m.get("question_hu", "?")
-            print(f"    {RED}{acc:.0f}%{RESET} -- [Topic {t}] {qtext}")
+        for m in nsmallest(5, missed_list, key=lambda x: x["accuracy"]):
+            app(MISSED_LINE_FMT.format(
+                pct=m["accuracy"] * 100,
+                topic=m.get("topic", "?"),
+                text=m.get("question_hu", "?"),
+            ))
     else:
-        print(f"    {GREEN}No frequently missed questions! Great work!{RESET}")
+        app(f"    {GREEN}No frequently missed questions! Great work!{RESET}")
 
     # ---- Vocab stats ----
     if vocab_data:
-        print()
-        print_divider()
-        print(f"\n  {BOLD}Vocabulary:{RESET}")
+        app("")
+        app(DIVIDER)
+        app(f"\n  {BOLD}Vocabulary:{RESET}")
         total_vocab = len(vocab_data)
-        mastered = sum(
-            1 for v in vocab_data.values()
-            if v.get("attempts", 0) >= 2 and (v.get("correct", 0) / v["attempts"]) >= 0.8
-        )
-        print(f"    Total words practiced: {total_vocab}")
-        print(f"    Mastered: {GREEN}{mastered}{RESET} / {total_vocab}")
-    print()
+        mastered = 0
+        for v in vocab_data.values():
+            att = v["attempts"]
+            if att >= 2 and v["correct"] / att >= 0.8:
+                mastered += 1
+        app(f"    Total words practiced: {total_vocab}")
+        app(f"    Mastered: {GREEN}{mastered}{RESET} / {total_vocab}")
+    app("")
 
     # ---- Recommendation ----
-    print_divider()
-    print(f"\n  {BOLD}Recommendation:{RESET}")
+    app(DIVIDER)
+    app(f"\n  {BOLD}Recommendation:{RESET}")
     if recommend_topic is not None:
-        label = TOPIC_NAMES_HU.get(recommend_topic, f"Topic {recommend_topic}")
-        if worst_accuracy == 0:
-            print(f"    {CYAN}Start with Topic {recommend_topic}: {label} (not attempted yet){RESET}")
-            print(f"    Run: python study.py --mode learn --topic {recommend_topic}")
+        if not_attempted:
+            app(f"    {CYAN}Start with Topic {recommend_topic}: {recommend_label} (not attempted yet){RESET}")
+            app(f"    Run: python study.py --mode learn --topic {recommend_topic}")
         else:
-            print(f"    {CYAN}Focus on Topic {recommend_topic}: {label} (lowest accuracy){RESET}")
-            print(f"    Run: python study.py --mode quiz --topic {recommend_topic}")
+            app(f"    {CYAN}Focus on Topic {recommend_topic}: {recommend_label} (lowest accuracy){RESET}")
+            app(f"    Run: python study.py --mode quiz --topic {recommend_topic}")
     else:
-        print(f"    {GREEN}All topics look good! Try a mock exam.{RESET}")
-        print(f"    Run: python study.py --mode exam")
-    print()
+        app(f"    {GREEN}All topics look good! Try a mock exam.{RESET}")
+        app(f"    Run: python study.py --mode exam")
+    app("")
+    write_lines(out)
 
 
 # ---------------------------------------------------------------------------
@@ -996,7 +1313,20 @@ def show_stats(questions, progress):
 # ---------------------------------------------------------------------------
 
 
-def main():
+# --mode value -> handler(questions, progress, args)
+_MODES = {
+    "learn": lambda q, p, a: mode_learn(q, p, a.topic),
+    "quiz": lambda q, p, a: mode_quiz(q, p, a.topic, a.limit),
+    "weak": lambda q, p, a: mode_weak(q, p),
+    "exam": lambda q, p, a: mode_exam(q, p),
+    "vocab": lambda q, p, a: mode_vocab(q, p, a.topic),
+}
+
+
+def _build_parser():
+    """Build the command-line parser (argparse is only imported on the CLI path)."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Hungarian Cultural Knowledge Exam -- CLI Study Tool",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1011,6 +1341,7 @@ Modes:
 Examples:
   python study.py --mode learn --topic 1
   python study.py --mode quiz --topic 3
+  python study.py --mode quiz --topic 3 --limit 10
   python study.py --mode weak
   python study.py --mode exam
   python study.py --mode vocab
@@ -1021,7 +1352,7 @@ Examples:
 
     parser.add_argument(
         "--mode",
-        choices=["learn", "quiz", "weak", "exam", "vocab"],
+        choices=list(_MODES),
         help="Study mode to use",
     )
     parser.add_argument(
@@ -1030,12 +1361,22 @@ Examples:
         choices=[1, 2, 3, 4, 5, 6],
         help="Topic number (1-6)",
     )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="Ask at most N random questions (quiz mode)",
+    )
     parser.add_argument(
         "--stats",
         action="store_true",
         help="Show study statistics",
     )
+    return parser
+
 
+def main():
+    parser = _build_parser()
     args = parser.parse_args()
 
     # Must specify either --mode or --stats
@@ -1050,6 +1391,10 @@ Examples:
         print(f"{YELLOW}Usage: python study.py --mode {args.mode} --topic N{RESET}")
         sys.exit(1)
 
+    if args.limit is not None and args.limit < 1:
+        print(f"{RED}Error: --limit must be at least 1.{RESET}")
+        sys.exit(1)
+
     # Load data
     questions = load_questions(QUESTIONS_FILE)
     progress = load_progress(PROGRESS_FILE)
@@ -1061,16 +1406,7 @@ Examples:
         show_stats(questions, progress)
         return
 
-    if args.mode == "learn":
-        mode_learn(questions, progress, args.topic)
-    elif args.mode == "quiz":
-        mode_quiz(questions, progress, args.topic)
-    elif args.mode == "weak":
-        mode_weak(questions, progress)
-    elif args.mode == "exam":
-        mode_exam(questions, progress)
-    elif args.mode == "vocab":
-        mode_vocab(questions, progress, args.topic)
+    _MODES[args.mode](questions, progress, args)
 
 
 if __name__ == "__main__":
@@ -12,12 +12,18 @@ Run:
 
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import datetime
+import functools
+import heapq
+import math
 import random
 import sys
 import os
 import time
 import unicodedata
+from collections import deque
 
 try:
     from textual.app import App, ComposeResult
@@ -26,40 +32,58 @@ try:
     from textual.screen import Screen, ModalScreen
     from textual.binding import Binding
     from textual import on
+    from rich.text import Text
 except ImportError:
     print("Textual not installed. Run:  pip install textual")
     sys.exit(1)
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from study import (
-    load_questions, load_progress, save_progress,
-    score_answer, question_id, get_questions_for_topic,
+    load_questions, load_progress, save_progress, encode_progress, write_progress,
+    score_answer, normalize_text,
     record_attempt, record_session, record_vocab_attempt,
     QUESTIONS_FILE, PROGRESS_FILE,
 )
 
+# One shared generator for every shuffle and draw; seed it for reproducible runs
+_RNG = random.Random()
+
 # ── Enhancement 1: Accent-aware typo tolerance ────────────────────────────────
 
 
+# Hungarian accented vowels map straight to their bare letters
+_HU_STRIP = str.maketrans("áéíóöőúüű", "aeiooouuu")
+
+
 def normalize_hu(text: str) -> str:
     """Lowercase and strip Hungarian combining accent marks via NFD decomposition."""
     lowered = text.lower()
-    nfd = unicodedata.normalize("NFD", lowered)
+    if lowered.isascii():
+        return lowered
+    stripped = lowered.translate(_HU_STRIP)
+    if stripped.isascii():
+        return stripped
+    # Other accented letters still need the general NFD path
+    nfd = unicodedata.normalize("NFD", stripped)
     return "".join(ch for ch in nfd if unicodedata.category(ch) != "Mn")
 
 
-def score_answer_tolerant(user_input: str, keywords: list) -> tuple:
+def score_answer_tolerant(user_input: str, keywords: list, keywords_norm=None) -> tuple:
     """
     Wrapper around score_answer that also tries accent-stripped input.
     Returns the better (score, matched, missed) tuple.
     """
-    result = score_answer(user_input, keywords)
-    score, matched, missed = result
-    if score < 1.0:
-        result2 = score_answer(normalize_hu(user_input), keywords)
-        if result2[0] > score:
-            return result2
-    return result
+    result = score_answer(user_input, keywords, keywords_norm)
+    # ASCII input has no accents to strip, so a second pass can't differ
+    if result[0] >= 1.0 or user_input.isascii():
+        return result
+    norm = normalize_hu(user_input)
+    # score_answer() already folds Hungarian accents via normalize_text(); the
+    # second pass only differs when stripping touched some other diacritic
+    if normalize_text(norm) == normalize_text(user_input):
+        return result
+    result2 = score_answer(norm, keywords, keywords_norm)
+    return result2 if result2[0] > result[0] else result
 
 
 # ── Enhancement 2: Leech detection ───────────────────────────────────────────
@@ -96,8 +120,7 @@ def weighted_sample(pool: list, n: int, progress: dict) -> list:
     q_data = progress.get("questions", {})
     weights = []
     for q in pool:
-        qid = question_id(q["question_hu"])
-        entry = q_data.get(qid)
+        entry = q_data.get(q["_qid"])
         if entry is None:
             weights.append(3.0)
         elif entry.get("accuracy", 1.0) < 0.4:
@@ -105,27 +128,12 @@ def weighted_sample(pool: list, n: int, progress: dict) -> list:
         else:
             weights.append(1.0)
 
-    target = min(n, len(pool))
-    chosen: list = []
-    seen_ids: set = set()
-    max_attempts = target * 20
-    attempts = 0
-    while len(chosen) < target and attempts < max_attempts:
-        picks = random.choices(pool, weights=weights, k=1)
-        p = picks[0]
-        pid = question_id(p["question_hu"])
-        if pid not in seen_ids:
-            seen_ids.add(pid)
-            chosen.append(p)
-        attempts += 1
-
-    if len(chosen) < target:
-        # Fallback: shuffle and slice
-        remaining = [q for q in pool if question_id(q["question_hu"]) not in seen_ids]
-        random.shuffle(remaining)
-        chosen.extend(remaining[: target - len(chosen)])
-
-    return chosen
+    # Weighted sampling without replacement in one pass (Efraimidis-Spirakis):
+    # key each item u ** (1 / w) and keep the n largest keys
+    rand = _RNG.random
+    keys = [rand() ** (1.0 / w) if w > 0 else -1.0 for w in weights]
+    idx = heapq.nlargest(min(n, len(pool)), range(len(pool)), key=keys.__getitem__)
+    return [pool[i] for i in idx]
 
 
 # ── Constants ─────────────────────────────────────────────────────────────────
@@ -140,6 +148,9 @@ TOPIC_HU = {
     3: "Irodalom és zene",              4: "Alaptörvény és intézmények",
     5: "Állampolgári jogok",            6: "Mindennapi Magyarország",
 }
+# "Topic N: Name" labels and difficulty stars for question headers, built once
+TOPIC_LABEL = {t: f"Topic {t}: {name}" for t, name in TOPIC_SHORT.items()}
+DIFF_STARS = {1: "★☆☆", 2: "★★☆", 3: "★★★"}
 
 # ── Topic introductions (shown in Study Guide before Q&A) ─────────────────────
 
@@ -299,32 +310,73 @@ TOPIC3_AUTHORS = [
 
 
 def srs_quality(score: float) -> int:
-    if score >= 0.9: return 5
-    if score >= 0.7: return 4
-    if score >= 0.6: return 3
-    if score >= 0.3: return 2
-    if score >= 0.1: return 1
-    return 0
+    """Map an answer score to an FSRS grade: 1 Again, 2 Hard, 3 Good, 4 Easy."""
+    if score >= 0.9: return 4
+    if score >= 0.7: return 3
+    if score >= 0.6: return 2
+    return 1
+
+
+# FSRS v4 default weights and the recall probability reviews are scheduled at
+_FSRS_W = (
+    0.4, 0.6, 2.4, 5.8, 4.93, 0.94, 0.86, 0.01, 1.49,
+    0.14, 0.94, 2.18, 0.05, 0.34, 1.26, 0.29, 2.61,
+)
+_FSRS_RETENTION = 0.9
+
 
+def _fsrs_step(stability, difficulty: float, elapsed: int, grade: int) -> tuple:
+    """One FSRS review: return the new (stability, difficulty) for a 1-4 grade.
 
-def update_srs(progress: dict, qid: str, quality: int) -> None:
+    ``stability`` is None for a card that has never been reviewed.
+    """
+    w = _FSRS_W
+    if stability is None:
+        return w[grade - 1], min(max(w[4] - (grade - 3) * w[5], 1.0), 10.0)
+    retrievability = (1 + elapsed / (9 * stability)) ** -1
+    d = w[7] * w[4] + (1 - w[7]) * (difficulty - w[6] * (grade - 3))
+    d = min(max(d, 1.0), 10.0)
+    if grade == 1:
+        s = (w[11] * d ** -w[12] * ((stability + 1) ** w[13] - 1)
+             * math.exp((1 - retrievability) * w[14]))
+        s = min(s, stability)  # a lapse never lengthens the interval
+    else:
+        s = stability * (
+            1 + math.exp(w[8]) * (11 - d) * stability ** -w[9]
+            * (math.exp((1 - retrievability) * w[10]) - 1)
+            * (w[15] if grade == 2 else 1) * (w[16] if grade == 4 else 1)
+        )
+    return s, d
+
+
+def update_srs(progress: dict, qid: str, grade: int) -> None:
     srs = progress.setdefault("srs", {})
-    entry = srs.setdefault(qid, {"interval": 0, "ease": 2.5, "due": None})
-    ef, interval = entry["ease"], entry["interval"]
-    if quality < 3:
-        interval = 1
-    elif interval == 0:
-        interval = 1
-    elif interval == 1:
-        interval = 6
+    entry = srs.setdefault(qid, {"interval": 0, "due": None})
+    today = datetime.date.today()
+    if "stability" in entry:
+        stability, difficulty = entry["stability"], entry["difficulty"]
+        last = datetime.date.fromisoformat(entry["last_review"])
+    elif entry.get("interval"):
+        # Carry an SM-2 card over: its interval is the stability it earned,
+        # and a low ease factor means a hard card
+        stability = float(entry["interval"])
+        difficulty = min(max(_FSRS_W[4] + (2.5 - entry.get("ease", 2.5)) * 4, 1.0), 10.0)
+        last = today
+        if entry.get("due"):
+            last = datetime.date.fromisoformat(entry["due"]) - datetime.timedelta(
+                days=entry["interval"]
+            )
     else:
-        interval = round(interval * ef)
-    ef = max(1.3, ef + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        stability, difficulty, last = None, 0.0, today
+    elapsed = max((today - last).days, 0)
+    stability, difficulty = _fsrs_step(stability, difficulty, elapsed, grade)
+    interval = max(1, round(9 * stability * (1 / _FSRS_RETENTION - 1)))
+    entry.pop("ease", None)
+    entry["stability"] = round(stability, 4)
+    entry["difficulty"] = round(difficulty, 4)
     entry["interval"] = interval
-    entry["ease"] = round(ef, 3)
-    entry["due"] = (
-        datetime.date.today() + datetime.timedelta(days=interval)
-    ).isoformat()
+    entry["last_review"] = today.isoformat()
+    entry["due"] = (today + datetime.timedelta(days=interval)).isoformat()
 
 
 def get_due_questions(progress: dict, questions: list) -> list:
@@ -332,7 +384,7 @@ def get_due_questions(progress: dict, questions: list) -> list:
     srs = progress.get("srs", {})
     result = []
     for q in questions:
-        entry = srs.get(question_id(q["question_hu"]))
+        entry = srs.get(q["_qid"])
         if entry is None or not entry.get("due") or entry["due"] <= today:
             result.append(q)
     return result
@@ -342,57 +394,94 @@ def srs_forecast(progress: dict, questions: list, days: int = 7) -> list:
     """Return [(date, count)] for the next `days` days."""
     srs = progress.get("srs", {})
     today = datetime.date.today()
-    counts: dict = {}
+    dates = [today + datetime.timedelta(days=d) for d in range(days)]
+    # Due dates are ISO strings: look them up instead of parsing each one
+    day_index = {dt.isoformat(): d for d, dt in enumerate(dates)}
+    counts = [0] * days
     for q in questions:
-        entry = srs.get(question_id(q["question_hu"]))
+        entry = srs.get(q["_qid"])
         if not entry or not entry.get("due"):
-            delta = 0
+            counts[0] += 1
         else:
-            delta = (datetime.date.fromisoformat(entry["due"]) - today).days
-        if 0 <= delta < days:
-            counts[delta] = counts.get(delta, 0) + 1
-    return [(today + datetime.timedelta(days=d), counts.get(d, 0)) for d in range(days)]
+            d = day_index.get(entry["due"])
+            if d is not None:
+                counts[d] += 1
+    return list(zip(dates, counts))
 
 
 # ── General helpers ───────────────────────────────────────────────────────────
 
 
-def topic_accuracy(progress: dict, topic: int) -> tuple:
-    correct = attempts = 0
+def topic_totals(progress: dict) -> dict:
+    """Return {topic: [correct, attempts]} for topics 1-6 in one pass over progress."""
+    totals = {t: [0, 0] for t in range(1, 7)}
     for entry in progress.get("questions", {}).values():
-        if entry.get("topic") == topic:
-            attempts += entry.get("attempts", 0)
-            correct += entry.get("correct", 0)
-    return correct, attempts
+        tot = totals.get(entry.get("topic"))
+        if tot is not None:
+            tot[0] += entry.get("correct", 0)
+            tot[1] += entry.get("attempts", 0)
+    return totals
+
+
+# Preallocated bar and rule strings; bars (up to 30 cells wide) are sliced from these
+_FULL_BAR = "█" * 30
+_EMPTY_BAR = "░" * 30
+_RULE = "─" * 50
+_RULE44 = _RULE[:44]
+
+
+def accuracy_bar_text(correct: int, attempts: int, width: int = 18) -> Text:
+    """accuracy_bar() as styled Text, for screens that skip markup parsing."""
+    if not attempts:
+        return Text.assemble((_RULE[:width], "white"), " ", ("--", "white"))
+    pct = correct / attempts
+    filled = round(pct * width)
+    color = "bright_green" if pct >= 0.6 else ("yellow" if pct >= 0.3 else "bright_red")
+    return Text.assemble(
+        (_FULL_BAR[:filled], color),
+        (_EMPTY_BAR[:width - filled], "white"),
+        " ",
+        (f"{pct * 100:.0f}%", color),
+    )
 
 
 def accuracy_bar(correct: int, attempts: int, width: int = 18) -> str:
     if not attempts:
-        return f"[white]{'─' * width}[/white] [white]--[/white]"
+        return f"[white]{_RULE[:width]}[/white] [white]--[/white]"
     pct = correct / attempts
     filled = round(pct * width)
     color = "bright_green" if pct >= 0.6 else ("yellow" if pct >= 0.3 else "bright_red")
     return (
-        f"[{color}]{'█' * filled}[/{color}]"
-        f"[white]{'░' * (width - filled)}[/white]"
+        f"[{color}]{_FULL_BAR[:filled]}[/{color}]"
+        f"[white]{_EMPTY_BAR[:width - filled]}[/white]"
         f" [{color}]{pct * 100:.0f}%[/{color}]"
     )
 
 
+@functools.lru_cache(maxsize=4096)
+def session_datetime(stamp: str):
+    """Parse a session's ISO timestamp; memoised by the string itself.
+
+    Returns None for a malformed stamp. Keying on the string rather than the
+    session dict keeps parsed values out of progress (and progress.json).
+    """
+    try:
+        return datetime.datetime.fromisoformat(stamp)
+    except ValueError:
+        return None
+
+
 def study_streak(progress: dict) -> int:
-    dates: set = set()
+    days: set = set()
     for s in progress.get("sessions", []):
         try:
-            dates.add(datetime.datetime.fromisoformat(s["date"]).date())
+            days.add(datetime.date.fromisoformat(s["date"][:10]).toordinal())
         except (ValueError, KeyError):
             pass
-    streak, check = 0, datetime.date.today()
-    for d in sorted(dates, reverse=True):
-        if d == check:
-            streak += 1
-            check -= datetime.timedelta(days=1)
-        elif d < check:
-            break
+    streak, check = 0, datetime.date.today().toordinal()
+    while check in days:
+        streak += 1
+        check -= 1
     return streak
 
 
@@ -406,28 +495,62 @@ def mask_keyword(kw: str) -> str:
 def build_mc_options(q: dict, all_questions: list) -> list:
     """Return [(answer_text, is_correct)] × 4, shuffled."""
     correct = q["answer_hu"]
-    pool = [x for x in all_questions if x["question_hu"] != q["question_hu"]]
-    random.shuffle(pool)
+    # Rejection-sample a handful of random picks rather than copying and
+    # shuffling the whole pool for three distractors
+    n = len(all_questions)
     wrong: list = []
     seen = {correct}
-    for c in pool:
-        ans = c["answer_hu"]
-        if len(ans) > 72:
-            ans = ans[:70] + "…"
+
+    def take(c: dict) -> None:
+        if c["question_hu"] == q["question_hu"]:
+            return
+        ans = c["_answer_short"]
         if ans not in seen:
             seen.add(ans)
             wrong.append(ans)
-        if len(wrong) == 3:
-            break
+
+    tries = 0
+    while n and len(wrong) < 3 and tries < 40:
+        take(all_questions[_RNG.randrange(n)])
+        tries += 1
+    if n and len(wrong) < 3:
+        # Small or repetitive pool: walk it once from a random offset so
+        # placeholders only appear when there really are no candidates left
+        start = _RNG.randrange(n)
+        for i in range(n):
+            take(all_questions[(start + i) % n])
+            if len(wrong) == 3:
+                break
     while len(wrong) < 3:
         wrong.append("—")
     options = [(correct, True)] + [(w, False) for w in wrong]
-    random.shuffle(options)
+    _RNG.shuffle(options)
     return options
 
 
 # ── Home Screen ───────────────────────────────────────────────────────────────
 
+# Fixed pieces of the dashboard markup, built once
+_DASH_RULE = "  [white]" + _RULE + "[/white]"
+_DASH_CAUGHT_UP = (
+    "[bold green on dark_green] ✓  All caught up — no SRS cards due today [/bold green on dark_green]"
+)
+_DASH_KEYS_TOPIC = (
+    "  [bright_white]G[/bright_white][white]=Guide  [/white]"
+    "[bright_white]L[/bright_white][white]=Learn  [/white]"
+    "[bright_white]Q[/bright_white][white]=Quiz  [/white]"
+    "[bright_white]M[/bright_white][white]=Multiple Choice  [/white]"
+    "[bright_white]W[/bright_white][white]=Weak Spots[/white]"
+)
+_DASH_KEYS_NO_TOPIC = (
+    "  [bright_white]G[/bright_white][white]=Guide  [/white]"
+    "[bright_white]L[/bright_white][white]=Learn  [/white]"
+    "[bright_white]Q[/bright_white][white]=Quiz  [/white]"
+    "[bright_white]M[/bright_white][white]=Multiple Choice  [/white]"
+    "[bright_white]E[/bright_white][white]=Exam[/white]"
+)
+
+
 
 class HomeScreen(Screen):
     """Dashboard: topic selector, mode launcher, accuracy + SRS forecast."""
@@ -473,18 +596,34 @@ class HomeScreen(Screen):
                 yield Static(id="dashboard-content")
         yield Footer()
 
+    _dash_text = None  # last markup pushed to #dashboard-content
+    _streak_cache = (None, 0)  # ((session count, date), streak)
+    _rendered_state = None  # (progress version, topic, date) last rendered
+
     def on_mount(self) -> None:
         self.refresh_dashboard()
 
     def on_screen_resume(self) -> None:
-        self.refresh_dashboard()
+        # Nothing to redraw if no progress changed while another screen was up
+        if self._dashboard_state() != self._rendered_state:
+            self.refresh_dashboard()
+
+    def _dashboard_state(self) -> tuple:
+        app = self.app
+        return (app.progress_version, app.selected_topic, datetime.date.today())
 
     def refresh_dashboard(self) -> None:
         app = self.app
+        self._rendered_state = self._dashboard_state()
         progress, questions = app.progress, app.questions
-        due_count = len(get_due_questions(progress, questions))
-        streak = study_streak(progress)
+        due_count = app.due_count()
         sessions = progress.get("sessions", [])
+        # Sessions are only ever appended, so the streak can change only
+        # when a session is added or the day rolls over
+        streak_key = (len(sessions), datetime.date.today())
+        if streak_key != self._streak_cache[0]:
+            self._streak_cache = (streak_key, study_streak(progress))
+        streak = self._streak_cache[1]
 
         lines = []
 
@@ -498,9 +637,7 @@ class HomeScreen(Screen):
                 f"[bold yellow on dark_orange] ⚡  {due_count} SRS card(s) due for review today [/bold yellow on dark_orange]"
             )
         else:
-            lines.append(
-                "[bold green on dark_green] ✓  All caught up — no SRS cards due today [/bold green on dark_green]"
-            )
+            lines.append(_DASH_CAUGHT_UP)
 
         streak_icon = "🔥" if streak >= 3 else ("★" if streak >= 1 else "○")
         lines.append(
@@ -511,11 +648,11 @@ class HomeScreen(Screen):
 
         # ── Per-topic accuracy ────────────────────────────────────────────────
         lines.append("[bold bright_white]  Per-Topic Accuracy[/bold bright_white]")
-        lines.append("  [white]" + "─" * 50 + "[/white]")
+        lines.append(_DASH_RULE)
         overall_c = overall_a = 0
         topic_accs = {}
         for t in range(1, 7):
-            c, a = topic_accuracy(progress, t)
+            c, a = app.topic_stats[t]
             overall_c += c
             overall_a += a
             topic_accs[t] = (c, a)
@@ -527,21 +664,18 @@ class HomeScreen(Screen):
                 f"[{pct_color}]{pct_str}[/{pct_color}]  [bright_white]{TOPIC_SHORT[t]}[/bright_white]"
             )
 
-        lines.append("  [white]" + "─" * 50 + "[/white]")
+        lines.append(_DASH_RULE)
         if overall_a:
             opct = overall_c / overall_a * 100
             oc = "bright_green" if opct >= 60 else ("yellow" if opct >= 30 else "bright_red")
             bar_filled = round(opct / 100 * 30)
-            bar = f"[{oc}]{'█' * bar_filled}[/{oc}][white]{'░' * (30 - bar_filled)}[/white]"
+            bar = f"[{oc}]{_FULL_BAR[:bar_filled]}[/{oc}][white]{_EMPTY_BAR[bar_filled:]}[/white]"
             lines.append(f"  [bold white]Overall Readiness:[/bold white]  {bar}  [{oc}]{opct:.0f}%[/{oc}]")
         else:
             lines.append("  [bold white]Overall Readiness:[/bold white]  [white]No data yet — start studying![/white]")
 
         # ── Leech count ───────────────────────────────────────────────────────
-        leech_count = sum(
-            1 for entry in progress.get("questions", {}).values()
-            if entry.get("is_leech")
-        )
+        leech_count = app.leech_count
         if leech_count:
             lines.append(
                 f"\n  [bold bright_red]⚠  Leeches: {leech_count}[/bold bright_red]  "
@@ -553,20 +687,20 @@ class HomeScreen(Screen):
         max_c = max((c for _, c in forecast), default=1) or 1
         today = datetime.date.today()
         lines.append("\n  [bold bright_white]SRS Review Forecast[/bold bright_white]")
-        lines.append("  [white]" + "─" * 50 + "[/white]")
+        lines.append(_DASH_RULE)
         for dt, count in forecast:
             delta = (dt - today).days
             day_label = dt.strftime("%a %d")
             prefix = "[bold yellow]▶ Today  [/bold yellow]" if delta == 0 else f"[white]  +{delta}d {day_label}[/white]"
             bw = round(count / max_c * 18) if count else 0
             color = "yellow" if (delta == 0 and count) else ("cyan" if count else "white")
-            bar = f"[{color}]{'█' * bw}[/{color}][white]{'░' * (18 - bw)}[/white]"
+            bar = f"[{color}]{_FULL_BAR[:bw]}[/{color}][white]{_EMPTY_BAR[:18 - bw]}[/white]"
             cnt = f"[{color}]{count:>3}[/{color}]" if count else "[white]  0[/white]"
             lines.append(f"  {prefix}  {bar} {cnt}")
 
         # ── Selected topic hint ───────────────────────────────────────────────
         lines.append("")
-        lines.append("  [white]" + "─" * 50 + "[/white]")
+        lines.append(_DASH_RULE)
         if app.selected_topic:
             t = app.selected_topic
             c, a = topic_accs[t]
@@ -574,24 +708,12 @@ class HomeScreen(Screen):
             lines.append(
                 f"  [bold cyan]▶  Topic {t}: {TOPIC_HU.get(t, '')}[/bold cyan][white]{pct}[/white]"
             )
-            lines.append(
-                "  [bright_white]G[/bright_white][white]=Guide  [/white]"
-                "[bright_white]L[/bright_white][white]=Learn  [/white]"
-                "[bright_white]Q[/bright_white][white]=Quiz  [/white]"
-                "[bright_white]M[/bright_white][white]=Multiple Choice  [/white]"
-                "[bright_white]W[/bright_white][white]=Weak Spots[/white]"
-            )
+            lines.append(_DASH_KEYS_TOPIC)
         else:
             lines.append(
                 "  [bright_yellow]Select a topic (1–6) using the buttons or number keys[/bright_yellow]"
             )
-            lines.append(
-                "  [bright_white]G[/bright_white][white]=Guide  [/white]"
-                "[bright_white]L[/bright_white][white]=Learn  [/white]"
-                "[bright_white]Q[/bright_white][white]=Quiz  [/white]"
-                "[bright_white]M[/bright_white][white]=Multiple Choice  [/white]"
-                "[bright_white]E[/bright_white][white]=Exam[/white]"
-            )
+            lines.append(_DASH_KEYS_NO_TOPIC)
 
         # Update topic buttons: label + variant based on accuracy
         for t in range(1, 7):
@@ -608,7 +730,11 @@ class HomeScreen(Screen):
             else:
                 btn.variant = "default"
 
-        self.query_one("#dashboard-content", Static).update("\n".join(lines))
+        # Skip Textual's re-render when nothing on the dashboard changed
+        text = "\n".join(lines)
+        if text != self._dash_text:
+            self._dash_text = text
+            self.query_one("#dashboard-content", Static).update(text)
 
     # ── Topic / mode helpers ──────────────────────────────────────────────────
 
@@ -626,18 +752,21 @@ class HomeScreen(Screen):
             self.notify("Select a topic first (press 1–6)", severity="warning")
             return
         if mode == "guide":
-            pool = list(get_questions_for_topic(app.questions, app.selected_topic))
-            app.push_screen(StudyGuideScreen(pool, app.selected_topic))
+            topic = app.selected_topic
+            app.push_screen(app.reusable_screen(
+                f"guide-{topic}",
+                lambda: StudyGuideScreen(app.questions_by_topic[topic], topic),
+            ))
         elif mode == "learn":
-            pool = list(get_questions_for_topic(app.questions, app.selected_topic))
+            pool = app.questions_by_topic[app.selected_topic]
             qs = weighted_sample(pool, 20, app.progress)
             app.push_screen(LearnScreen(qs, app.selected_topic))
         elif mode == "quiz":
-            pool = list(get_questions_for_topic(app.questions, app.selected_topic))
+            pool = app.questions_by_topic[app.selected_topic]
             qs = weighted_sample(pool, 20, app.progress)
             app.push_screen(QuizScreen(qs, "quiz", topic=app.selected_topic))
         elif mode == "mc":
-            pool = list(get_questions_for_topic(app.questions, app.selected_topic))
+            pool = app.questions_by_topic[app.selected_topic]
             qs = weighted_sample(pool, 20, app.progress)
             app.push_screen(MultiChoiceScreen(qs, app.selected_topic))
         elif mode == "weak":
@@ -651,35 +780,34 @@ class HomeScreen(Screen):
             if not qs:
                 self.notify("No cards due today!", severity="information")
                 return
-            random.shuffle(qs)
+            _RNG.shuffle(qs)
             app.push_screen(QuizScreen(qs, "srs"))
         elif mode == "exam":
             app.push_screen(ExamBriefingScreen(self._exam_questions()))
         elif mode == "vocab":
             app.push_screen(VocabScreen(app.selected_topic))
         elif mode == "stats":
-            app.push_screen(StatsScreen())
+            app.push_screen(app.reusable_screen("stats", StatsScreen))
 
     def _weak_questions(self) -> list:
         q_data = self.app.progress.get("questions", {})
-        qmap = {question_id(q["question_hu"]): q for q in self.app.questions}
+        topic = self.app.selected_topic
+        pool = self.app.questions_by_topic[topic] if topic else self.app.questions
         weak = []
-        for qid, q in qmap.items():
-            entry = q_data.get(qid)
+        for q in pool:
+            entry = q_data.get(q["_qid"])
             acc = entry["accuracy"] if entry else 0.0
             if entry is None or acc < 0.6:
                 weak.append((acc, q))
         weak.sort(key=lambda x: x[0])
-        if topic := self.app.selected_topic:
-            weak = [(a, q) for a, q in weak if q.get("topic") == topic]
         return [q for _, q in weak]
 
     def _exam_questions(self) -> list:
         qs = []
         for t in range(1, 7):
-            tqs = get_questions_for_topic(self.app.questions, t)
-            qs.extend(random.sample(tqs, min(2, len(tqs))))
-        random.shuffle(qs)
+            tqs = self.app.questions_by_topic[t]
+            qs.extend(_RNG.sample(tqs, min(2, len(tqs))))
+        _RNG.shuffle(qs)
         return qs
 
     # ── Keyboard actions ──────────────────────────────────────────────────────
@@ -754,8 +882,8 @@ class LearnScreen(Screen):
         Binding("space",  "reveal",     "Reveal",      show=True),
         Binding("r",      "reveal",     "Reveal",      show=False),
         Binding("1",      "rate_bad",   "1 Didn't know", show=True),
-        Binding("3",      "rate_ok",    "3 Got it",    show=True),
-        Binding("5",      "rate_good",  "5 Easy",      show=True),
+        Binding("2",      "rate_ok",    "2 Almost",    show=True),
+        Binding("3",      "rate_good",  "3 Got it",    show=True),
         Binding("s",      "skip",       "Skip",        show=True),
         Binding("right",  "next_card",  "Next",        show=False),
         Binding("left",   "prev_card",  "Prev",        show=False),
@@ -792,72 +920,78 @@ class LearnScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
+        # Widgets updated on every question/card, looked up once
+        self._w_session_bar    = self.query_one("#session-bar", ProgressBar)
+        self._w_learn_progress = self.query_one("#learn-progress", Static)
+        self._w_card_area      = self.query_one("#card-area")
+        self._w_card_question  = self.query_one("#card-question", Static)
+        self._w_card_answer    = self.query_one("#card-answer", Static)
+        self._w_card_keywords  = self.query_one("#card-keywords", Static)
+        self._w_btn_reveal     = self.query_one("#btn-reveal", Button)
+        self._w_rating_row     = self.query_one("#rating-row", Horizontal)
         self._show_card()
 
     def _show_card(self) -> None:
         q = self.questions[self.idx]
         total = len(self.questions)
-        diff = {1: "★☆☆", 2: "★★☆", 3: "★★★"}.get(q.get("difficulty", 1), "★☆☆")
+        diff = DIFF_STARS.get(q.get("difficulty", 1), "★☆☆")
         t_name = TOPIC_SHORT.get(self.topic, "")
 
-        self.query_one("#session-bar", ProgressBar).update(progress=self.idx)
-        self.query_one("#learn-progress", Static).update(
+        self._w_session_bar.update(progress=self.idx)
+        self._w_learn_progress.update(
             f"[bold]📖  Learn[/bold]  [dim]Topic {self.topic}: {t_name}[/dim]  "
             f"[yellow]{diff}[/yellow]"
         )
-        card_area = self.query_one("#card-area")
+        card_area = self._w_card_area
         card_area.border_title = f" Card {self.idx + 1} / {total} "
 
-        self.query_one("#card-question", Static).update(
+        self._w_card_question.update(
             f"\n[bold cyan]🇭🇺  {q['question_hu']}[/bold cyan]\n\n"
             f"[dim]🇬🇧  {q['question_en']}[/dim]\n"
         )
-        self.query_one("#card-answer",   Static).update("")
-        self.query_one("#card-keywords", Static).update("")
-        self.query_one("#btn-reveal",    Button).display = True
-        self.query_one("#rating-row",    Horizontal).display = False
+        self._w_card_answer.update("")
+        self._w_card_keywords.update("")
+        self._w_btn_reveal.display = True
+        self._w_rating_row.display = False
         self.revealed = False
 
     def _reveal(self) -> None:
         q = self.questions[self.idx]
-        kws = q.get("keywords_hu", [])
-        if isinstance(kws, str):
-            kws = [k.strip() for k in kws.split(",") if k.strip()]
-        kw_rich = "  ".join(f"[bold magenta]{k}[/bold magenta]" for k in kws)
+        kw_rich = q["_kws_rich"]
 
-        self.query_one("#card-answer", Static).update(
+        self._w_card_answer.update(
             f"\n[bold green]🇭🇺  {q['answer_hu']}[/bold green]\n\n"
             f"[dim]🇬🇧  {q['answer_en']}[/dim]\n"
         )
         kw_line = (
             f"[dim]Keywords:[/dim]  {kw_rich}\n\n" if kw_rich else "\n"
         )
-        self.query_one("#card-keywords", Static).update(
+        self._w_card_keywords.update(
             kw_line +
             "[dim]Rate yourself:  "
             "[red]1[/red] Didn't know  ·  "
             "[yellow]2[/yellow] Almost  ·  "
             "[green]3[/green] Got it![/dim]"
         )
-        self.query_one("#btn-reveal",  Button).display = False
-        self.query_one("#rating-row",  Horizontal).display = True
-        self.query_one("#card-area").border_title = " ✦ Answer revealed — rate yourself "
+        self._w_btn_reveal.display = False
+        self._w_rating_row.display = True
+        self._w_card_area.border_title = " ✦ Answer revealed — rate yourself "
         self.revealed = True
 
-    def _rate(self, quality: int) -> None:
+    def _rate(self, grade: int) -> None:
         """Record SRS rating and advance to next card."""
         if not self.revealed:
             return
         q = self.questions[self.idx]
-        qid = question_id(q["question_hu"])
-        update_srs(self.app.progress, qid, quality)
-        save_progress(self.app.progress, PROGRESS_FILE)
+        qid = q["_qid"]
+        self.app.update_srs(qid, grade)
+        self.app.mark_dirty()
 
         srs_entry = self.app.progress.get("srs", {}).get(qid, {})
         interval = srs_entry.get("interval", 1)
-        labels = {1: "✘ Didn't know", 3: "~ Almost", 5: "✓ Got it!"}
+        labels = {1: "✘ Didn't know", 2: "~ Almost", 3: "✓ Got it!"}
         self.notify(
-            f"{labels.get(quality, '')} — next review in {interval} day(s)",
+            f"{labels.get(grade, '')} — next review in {interval} day(s)",
             timeout=1.5,
         )
 
@@ -866,7 +1000,7 @@ class LearnScreen(Screen):
             record_session(
                 self.app.progress, "learn", 0, len(self.questions), self.topic
             )
-            save_progress(self.app.progress, PROGRESS_FILE)
+            self.app.schedule_save()
             self.notify("All cards reviewed!", severity="information")
             self.app.pop_screen()
         else:
@@ -879,19 +1013,19 @@ class LearnScreen(Screen):
             self._reveal()
 
     def action_rate_bad(self) -> None:
-        """Rate as 'Didn't know' (quality 1) — only fires after reveal."""
+        """Rate as 'Didn't know' (grade 1) — only fires after reveal."""
         if self.revealed:
             self._rate(1)
 
     def action_rate_ok(self) -> None:
-        """Rate as 'Got it' (quality 3) — only fires after reveal."""
+        """Rate as 'Almost' (grade 2, Hard) — only fires after reveal."""
         if self.revealed:
-            self._rate(3)
+            self._rate(2)
 
     def action_rate_good(self) -> None:
-        """Rate as 'Easy' (quality 5) — only fires after reveal."""
+        """Rate as 'Got it' (grade 3, Good) — only fires after reveal."""
         if self.revealed:
-            self._rate(5)
+            self._rate(3)
 
     def action_next_card(self) -> None:
         if not self.revealed:
@@ -911,7 +1045,7 @@ class LearnScreen(Screen):
             record_session(
                 self.app.progress, "learn", 0, len(self.questions), self.topic
             )
-            save_progress(self.app.progress, PROGRESS_FILE)
+            self.app.schedule_save()
             self.notify("All cards reviewed!", severity="information")
             self.app.pop_screen()
         else:
@@ -938,11 +1072,11 @@ class LearnScreen(Screen):
 
     @on(Button.Pressed, "#btn-rate-2")
     def on_rate2(self) -> None:
-        self._rate(3)
+        self._rate(2)
 
     @on(Button.Pressed, "#btn-rate-3")
     def on_rate3(self) -> None:
-        self._rate(5)
+        self._rate(3)
 
     @on(Button.Pressed, "#btn-prev")
     def on_prev(self) -> None:
@@ -959,6 +1093,14 @@ class LearnScreen(Screen):
 
 # ── Quiz Screen ───────────────────────────────────────────────────────────────
 
+# Answer feedback by score bucket: (sc >= 0.3) + (sc >= 0.6) indexes these
+_RESULT_TEMPLATES = (
+    (" ✘  Incorrect  {pct:.0f}% ", "bold red"),
+    (" ~  Partial  {pct:.0f}% ",   "bold yellow"),
+    (" ✔  Correct!  {pct:.0f}% ",  "bold green"),
+)
+_RESULT_TITLES = (" ✘ Incorrect ", " ~ Partial ", " ✔ Correct ")
+
 
 class QuizScreen(Screen):
     """Free-text quiz for quiz / weak / srs / exam modes. Has hint button."""
@@ -991,7 +1133,9 @@ class QuizScreen(Screen):
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         with Container(id="quiz-layout"):
-            yield Static(id="quiz-header", classes="section-title")
+            with Horizontal(id="quiz-header-row"):
+                yield Static(id="quiz-header", classes="section-title")
+                yield Static(id="quiz-timer", classes="section-title")
             yield ProgressBar(total=len(self.questions), id="session-bar", show_eta=False)
             yield Rule()
             with ScrollableContainer(id="quiz-area"):
@@ -1011,10 +1155,22 @@ class QuizScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
+        # Widgets updated on every question/card, looked up once
+        self._w_quiz_timer    = self.query_one("#quiz-timer", Static)
+        self._w_session_bar   = self.query_one("#session-bar", ProgressBar)
+        self._w_quiz_header   = self.query_one("#quiz-header", Static)
+        self._w_quiz_area     = self.query_one("#quiz-area")
+        self._w_quiz_question = self.query_one("#quiz-question", Static)
+        self._w_quiz_feedback = self.query_one("#quiz-feedback", Static)
+        self._w_answer_input  = self.query_one("#answer-input", Input)
+        self._w_btn_submit    = self.query_one("#btn-submit", Button)
+        self._w_btn_hint      = self.query_one("#btn-hint", Button)
+        self._w_btn_next      = self.query_one("#btn-next", Button)
         if self.is_exam:
             self.exam_start = time.time()
             self.set_interval(1.0, self._tick_timer)
         self._show_question()
+        self._tick_timer()
 
     # ── Timer ─────────────────────────────────────────────────────────────────
 
@@ -1028,15 +1184,14 @@ class QuizScreen(Screen):
             return
         m, s = divmod(int(remaining), 60)
         tc = "green" if remaining > 600 else ("yellow" if remaining > 120 else "red")
-        total = len(self.questions)
-        self.query_one("#quiz-header", Static).update(
-            f"[bold]Mock Exam[/bold]  [dim]Q {self.idx + 1}/{total}[/dim]  "
-            f"[{tc}]⏱ {m:02d}:{s:02d}[/{tc}]"
-        )
+        # Only the countdown label changes each second; the header is left alone
+        self._w_quiz_timer.update(f"[{tc}]⏱ {m:02d}:{s:02d}[/{tc}]")
+
+    _MODE_LABELS = {"quiz": "Quiz", "weak": "Weak Spots",
+                    "srs": "SRS Review", "exam": "Mock Exam"}
 
     def _mode_label(self) -> str:
-        return {"quiz": "Quiz", "weak": "Weak Spots",
-                "srs": "SRS Review", "exam": "Mock Exam"}.get(self.mode, self.mode.title())
+        return self._MODE_LABELS.get(self.mode) or self.mode.title()
 
     # ── Display ───────────────────────────────────────────────────────────────
 
@@ -1047,42 +1202,42 @@ class QuizScreen(Screen):
 
         q = self.questions[self.idx]
         total = len(self.questions)
-        diff = {1: "★", 2: "★★", 3: "★★★"}.get(
-            q.get("difficulty", 1), "★"
-        )
-        self.query_one("#session-bar", ProgressBar).update(progress=self.idx)
+        self._w_session_bar.update(progress=self.idx)
         t_num = q.get("topic", "?")
-        t_name = TOPIC_SHORT.get(t_num, f"Topic {t_num}")
-
-        diff = {1: "★☆☆", 2: "★★☆", 3: "★★★"}.get(q.get("difficulty", 1), "★☆☆")
+        t_label = TOPIC_LABEL.get(t_num) or f"Topic {t_num}"
+        diff = DIFF_STARS.get(q.get("difficulty", 1), "★☆☆")
         pct_done = self.idx / total * 100 if total else 0
 
-        if not self.is_exam:
-            self.query_one("#quiz-header", Static).update(
-                f"[bold]{self._mode_label()}[/bold]  "
+        mode_label = self._mode_label()
+        if self.is_exam:
+            self._w_quiz_header.update(
+                f"[bold]Mock Exam[/bold]  [dim]Q {self.idx + 1}/{total}[/dim]"
+            )
+        else:
+            self._w_quiz_header.update(
+                f"[bold]{mode_label}[/bold]  "
                 f"[dim]Q {self.idx + 1}/{total}  ·  "
                 f"Score: {self.total_score:.1f}  ·  "
                 f"{pct_done:.0f}% done[/dim]"
             )
 
-        quiz_area = self.query_one("#quiz-area")
-        quiz_area.border_title = f" {self._mode_label()} — Q {self.idx + 1} / {total} "
+        self._w_quiz_area.border_title = f" {mode_label} — Q {self.idx + 1} / {total} "
 
-        self.query_one("#quiz-question", Static).update(
-            f"[dim]Topic {t_num}: {t_name}  {diff}[/dim]\n\n"
+        self._w_quiz_question.update(
+            f"[dim]{t_label}  {diff}[/dim]\n\n"
             f"[bold cyan]🇭🇺  {q['question_hu']}[/bold cyan]\n\n"
             f"[dim]🇬🇧  {q['question_en']}[/dim]"
         )
-        self.query_one("#quiz-feedback", Static).update("")
+        self._w_quiz_feedback.update("")
 
-        inp = self.query_one("#answer-input", Input)
+        inp = self._w_answer_input
         inp.value = ""
         inp.placeholder = "Írja ide a választ magyarul… / Type the answer in Hungarian…"
         inp.focus()
 
-        self.query_one("#btn-submit", Button).display = True
-        self.query_one("#btn-hint",   Button).display = not self.is_exam
-        self.query_one("#btn-next",   Button).display = False
+        self._w_btn_submit.display = True
+        self._w_btn_hint.display = not self.is_exam
+        self._w_btn_next.display = False
         self.answered = False
         self.hint_used = False
 
@@ -1095,14 +1250,11 @@ class QuizScreen(Screen):
             return
         self.hint_used = True
         q = self.questions[self.idx]
-        kws = q.get("keywords_hu", [])
-        if isinstance(kws, str):
-            kws = [k.strip() for k in kws.split(",") if k.strip()]
-        masked = "   ".join(mask_keyword(kw) for kw in kws)
-        self.query_one("#quiz-feedback", Static).update(
+        masked = q["_kws_masked"]
+        self._w_quiz_feedback.update(
             f"[dim]Hint (−20% score penalty):[/dim]  [yellow]{masked}[/yellow]"
         )
-        self.query_one("#btn-hint", Button).display = False
+        self._w_btn_hint.display = False
 
     # ── Submit ────────────────────────────────────────────────────────────────
 
@@ -1110,55 +1262,54 @@ class QuizScreen(Screen):
         if self.answered:
             return
         q = self.questions[self.idx]
-        user_answer = self.query_one("#answer-input", Input).value.strip()
-
-        kws = q.get("keywords_hu", [])
-        if isinstance(kws, str):
-            kws = [k.strip() for k in kws.split(",") if k.strip()]
+        user_answer = self._w_answer_input.value.strip()
 
-        sc, matched, missed = score_answer_tolerant(user_answer, kws)
+        sc, matched, missed = score_answer_tolerant(
+            user_answer, q["keywords_hu"], q["_keywords_norm"]
+        )
         if self.hint_used:
             sc *= 0.8
 
         self.total_score += sc
         self.answered = True
 
-        record_attempt(self.app.progress, q, sc)
-        qid = question_id(q["question_hu"])
-        is_correct = sc >= 0.6
-        update_leech(self.app.progress, qid, is_correct)
-        update_srs(self.app.progress, qid, srs_quality(sc))
-        save_progress(self.app.progress, PROGRESS_FILE)
-
-        if sc >= 0.6:
-            result = f"[bold green] ✔  Correct!  {sc * 100:.0f}% [/bold green]"
-            quiz_title = " ✔ Correct "
-        elif sc >= 0.3:
-            result = f"[bold yellow] ~  Partial  {sc * 100:.0f}% [/bold yellow]"
-            quiz_title = " ~ Partial "
-        else:
-            result = f"[bold red] ✘  Incorrect  {sc * 100:.0f}% [/bold red]"
-            quiz_title = " ✘ Incorrect "
+        self.app.record_attempt(q, sc)
+        qid = q["_qid"]
+        bucket = (sc >= 0.3) + (sc >= 0.6)
+        is_correct = bucket == 2
+        self.app.update_leech(qid, is_correct)
+        self.app.update_srs(qid, srs_quality(sc))
+        self.app.mark_dirty()
 
-        self.query_one("#quiz-area").border_title = quiz_title
-        hint_note = "  [dim](−20% hint penalty)[/dim]" if self.hint_used else ""
+        template, style = _RESULT_TEMPLATES[bucket]
+        self._w_quiz_area.border_title = _RESULT_TITLES[bucket]
         srs_entry = self.app.progress.get("srs", {}).get(qid, {})
         interval = srs_entry.get("interval", 1)
-        matched_line = f"\n[green]  ✔  Matched:  {', '.join(matched)}[/green]" if matched else ""
-        missed_line  = f"\n[red]  ✘  Missed:   {', '.join(missed)}[/red]"      if missed  else ""
-
-        self.query_one("#quiz-feedback", Static).update(
-            f"{result}{hint_note}\n\n"
-            f"[bold]Correct answer:[/bold]\n"
-            f"[bold green]🇭🇺  {q['answer_hu']}[/bold green]\n"
-            f"[dim]🇬🇧  {q['answer_en']}[/dim]"
-            f"{matched_line}{missed_line}\n\n"
-            f"[dim]Next SRS review in {interval} day(s)  ·  Press Enter for next →[/dim]"
-        )
 
-        self.query_one("#btn-submit", Button).display = False
-        self.query_one("#btn-hint",   Button).display = False
-        self.query_one("#btn-next",   Button).display = True
+        # Assembled from styled pieces, so no markup is parsed per answer and
+        # brackets in answers or keywords are shown literally
+        parts = [(template.format(pct=sc * 100), style)]
+        if self.hint_used:
+            parts += ["  ", ("(−20% hint penalty)", "dim")]
+        parts += [
+            "\n\n",
+            ("Correct answer:", "bold"), "\n",
+            (f"🇭🇺  {q['answer_hu']}", "bold green"), "\n",
+            (f"🇬🇧  {q['answer_en']}", "dim"),
+        ]
+        if matched:
+            parts += ["\n", (f"  ✔  Matched:  {', '.join(matched)}", "green")]
+        if missed:
+            parts += ["\n", (f"  ✘  Missed:   {', '.join(missed)}", "red")]
+        parts += [
+            "\n\n",
+            (f"Next SRS review in {interval} day(s)  ·  Press Enter for next →", "dim"),
+        ]
+        self._w_quiz_feedback.update(Text.assemble(*parts))
+
+        self._w_btn_submit.display = False
+        self._w_btn_hint.display = False
+        self._w_btn_next.display = True
 
     # ── Finish ────────────────────────────────────────────────────────────────
 
@@ -1168,7 +1319,7 @@ class QuizScreen(Screen):
             pts = self.total_score / total * 30 if total else 0
             passed = pts >= 16
             record_session(self.app.progress, "exam", pts, 30)
-            save_progress(self.app.progress, PROGRESS_FILE)
+            self.app.schedule_save()
             self.notify(
                 f"Exam done — {pts:.1f}/30 pts — {'PASSED ✔' if passed else 'FAILED ✘'}",
                 severity="information" if passed else "error",
@@ -1176,7 +1327,7 @@ class QuizScreen(Screen):
         else:
             pct = self.total_score / total * 100 if total else 0
             record_session(self.app.progress, self.mode, self.total_score, total, self.topic)
-            save_progress(self.app.progress, PROGRESS_FILE)
+            self.app.schedule_save()
             self.notify(
                 f"{self._mode_label()} done!  {self.total_score:.1f}/{total} ({pct:.0f}%)",
                 severity="information",
@@ -1240,14 +1391,19 @@ class MultiChoiceScreen(Screen):
     """4-option multiple choice — press 1-4 or click to answer."""
 
     BINDINGS = [
-        Binding("1", "pick1", "A", show=True),
-        Binding("2", "pick2", "B", show=True),
-        Binding("3", "pick3", "C", show=True),
-        Binding("4", "pick4", "D", show=True),
+        Binding("1", "pick(0)", "A", show=True),
+        Binding("2", "pick(1)", "B", show=True),
+        Binding("3", "pick(2)", "C", show=True),
+        Binding("4", "pick(3)", "D", show=True),
         Binding("enter",  "next_q",  "Next",  show=False),
         Binding("escape", "go_back", "Back"),
     ]
 
+    _HEADER = (
+        "[bold]Multiple Choice[/bold]  [dim]Q {n}/{total}[/dim]  "
+        "[dim]Score: {score}/{answered}[/dim]  [dim]{topic}[/dim]"
+    )
+
     def __init__(self, questions: list, topic: int) -> None:
         super().__init__()
         self.questions = list(questions)
@@ -1277,7 +1433,13 @@ class MultiChoiceScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
-        self.query_one("#btn-next", Button).display = False
+        # Widgets updated on every question/card, looked up once
+        self._w_btn_next    = self.query_one("#btn-next", Button)
+        self._w_mc_header   = self.query_one("#mc-header", Static)
+        self._w_mc_question = self.query_one("#mc-question", Static)
+        self._w_mc_feedback = self.query_one("#mc-feedback", Static)
+        self._mc_btns = [self.query_one(f"#mc-opt-{i + 1}", Button) for i in range(4)]
+        self._w_btn_next.display = False
         self._show_question()
 
     def _show_question(self) -> None:
@@ -1291,26 +1453,24 @@ class MultiChoiceScreen(Screen):
         self.answered = False
 
         t_num = q.get("topic", "?")
-        t_name = TOPIC_SHORT.get(t_num, f"Topic {t_num}")
-        self.query_one("#mc-header", Static).update(
-            f"[bold]Multiple Choice[/bold]  [dim]Q {self.idx + 1}/{total}[/dim]  "
-            f"[dim]Score: {self.score}/{self.idx}[/dim]  "
-            f"[dim]Topic {t_num}: {t_name}[/dim]"
-        )
-        self.query_one("#mc-question", Static).update(
+        self._w_mc_header.update(self._HEADER.format(
+            n=self.idx + 1, total=total, score=self.score, answered=self.idx,
+            topic=TOPIC_LABEL.get(t_num) or f"Topic {t_num}",
+        ))
+        self._w_mc_question.update(
             f"[bold cyan]🇭🇺 {q['question_hu']}[/bold cyan]\n"
             f"[dim]🇬🇧 {q['question_en']}[/dim]"
         )
-        self.query_one("#mc-feedback", Static).update("")
+        self._w_mc_feedback.update("")
 
         labels = ["A", "B", "C", "D"]
         for i, (text, _) in enumerate(self.options):
-            btn = self.query_one(f"#mc-opt-{i + 1}", Button)
+            btn = self._mc_btns[i]
             display = f"{i + 1}.  {labels[i]})  {text}"
             btn.label = display
             btn.variant = "default"
 
-        self.query_one("#btn-next", Button).display = False
+        self._w_btn_next.display = False
 
     def _pick(self, idx: int) -> None:
         if self.answered or idx >= len(self.options):
@@ -1320,11 +1480,12 @@ class MultiChoiceScreen(Screen):
         text, is_correct = self.options[idx]
         q = self.questions[self.idx]
 
-        # Colour the buttons
-        for i, (_, correct) in enumerate(self.options):
-            btn = self.query_one(f"#mc-opt-{i + 1}", Button)
+        # Colour the buttons, noting the correct answer on the way
+        correct_text = None
+        for i, (btn, (opt_text, correct)) in enumerate(zip(self._mc_btns, self.options)):
             if correct:
                 btn.variant = "success"
+                correct_text = opt_text
             elif i == idx and not is_correct:
                 btn.variant = "error"
 
@@ -1332,30 +1493,29 @@ class MultiChoiceScreen(Screen):
         if is_correct:
             self.score += 1
 
-        record_attempt(self.app.progress, q, sc)
-        qid = question_id(q["question_hu"])
-        update_leech(self.app.progress, qid, is_correct)
-        update_srs(self.app.progress, qid, 5 if is_correct else 0)
-        save_progress(self.app.progress, PROGRESS_FILE)
+        self.app.record_attempt(q, sc)
+        qid = q["_qid"]
+        self.app.update_leech(qid, is_correct)
+        self.app.update_srs(qid, 3 if is_correct else 1)
+        self.app.mark_dirty()
 
         if is_correct:
-            self.query_one("#mc-feedback", Static).update(
+            self._w_mc_feedback.update(
                 "[bold green]✔  Correct![/bold green]"
             )
         else:
-            correct_text = next(t for t, c in self.options if c)
-            self.query_one("#mc-feedback", Static).update(
+            self._w_mc_feedback.update(
                 f"[bold red]✘  Wrong.[/bold red]  "
                 f"Correct: [green]{correct_text}[/green]"
             )
 
-        self.query_one("#btn-next", Button).display = True
+        self._w_btn_next.display = True
 
     def _finish(self) -> None:
         total = len(self.questions)
         pct = self.score / total * 100 if total else 0
         record_session(self.app.progress, "mc", self.score, total, self.topic)
-        save_progress(self.app.progress, PROGRESS_FILE)
+        self.app.schedule_save()
         self.notify(
             f"Multiple Choice done!  {self.score}/{total} ({pct:.0f}%)",
             severity="information",
@@ -1364,10 +1524,8 @@ class MultiChoiceScreen(Screen):
 
     # ── Keyboard actions ──────────────────────────────────────────────────────
 
-    def action_pick1(self): self._pick(0)
-    def action_pick2(self): self._pick(1)
-    def action_pick3(self): self._pick(2)
-    def action_pick4(self): self._pick(3)
+    def action_pick(self, n: int) -> None:
+        self._pick(n)
 
     def action_next_q(self) -> None:
         if self.answered:
@@ -1385,16 +1543,26 @@ class MultiChoiceScreen(Screen):
 
     # ── Button handlers ───────────────────────────────────────────────────────
 
-    @on(Button.Pressed)
-    def handle_button(self, event: Button.Pressed) -> None:
-        bid = event.button.id
-        if bid and bid.startswith("mc-opt-"):
-            self._pick(int(bid.split("-")[-1]) - 1)
-        elif bid == "btn-next":
-            self.idx += 1
-            self._show_question()
-        elif bid == "btn-back":
-            self.action_go_back()
+    @on(Button.Pressed, "#mc-opt-1")
+    def on_opt1(self) -> None: self._pick(0)
+
+    @on(Button.Pressed, "#mc-opt-2")
+    def on_opt2(self) -> None: self._pick(1)
+
+    @on(Button.Pressed, "#mc-opt-3")
+    def on_opt3(self) -> None: self._pick(2)
+
+    @on(Button.Pressed, "#mc-opt-4")
+    def on_opt4(self) -> None: self._pick(3)
+
+    @on(Button.Pressed, "#btn-next")
+    def on_next(self) -> None:
+        self.idx += 1
+        self._show_question()
+
+    @on(Button.Pressed, "#btn-back")
+    def on_back(self) -> None:
+        self.action_go_back()
 
 
 # ── Vocab Screen ──────────────────────────────────────────────────────────────
@@ -1436,23 +1604,27 @@ class VocabScreen(Screen):
         yield Footer()
 
     def on_mount(self) -> None:
+        # Widgets updated on every question/card, looked up once
+        self._w_vocab_progress = self.query_one("#vocab-progress", Static)
+        self._w_vocab_front    = self.query_one("#vocab-front", Static)
+        self._w_vocab_back     = self.query_one("#vocab-back", Static)
+        self._w_btn_flip       = self.query_one("#btn-flip", Button)
+        self._w_vocab_rate     = self.query_one("#vocab-rate", Horizontal)
         qs = self.app.questions
         if self.topic:
-            qs = get_questions_for_topic(qs, self.topic)
-        seen: set = set()
+            qs = self.app.questions_by_topic[self.topic]
+        # First question to use a keyword supplies its card
+        by_kw: dict = {}
         for q in qs:
-            kws = q.get("keywords_hu", [])
-            if isinstance(kws, str):
-                kws = [k.strip() for k in kws.split(",") if k.strip()]
-            for kw in kws:
-                if kw not in seen:
-                    seen.add(kw)
-                    self.cards.append({
+            for kw in q["keywords_hu"]:
+                if kw not in by_kw:
+                    by_kw[kw] = {
                         "keyword_hu": kw,
                         "question_en": q["question_en"],
                         "answer_en": q["answer_en"],
-                    })
-        random.shuffle(self.cards)
+                    }
+        self.cards = list(by_kw.values())
+        _RNG.shuffle(self.cards)
         self._show_card()
 
     def _show_card(self) -> None:
@@ -1462,31 +1634,31 @@ class VocabScreen(Screen):
             return
         card = self.cards[self.idx]
         total = len(self.cards)
-        self.query_one("#vocab-progress", Static).update(
+        self._w_vocab_progress.update(
             f"[bold]Vocab Drill[/bold]  [dim]Card {self.idx + 1}/{total}[/dim]  "
             f"[green]{self.correct}[/green] correct / {self.total} answered"
         )
-        self.query_one("#vocab-front", Static).update(
+        self._w_vocab_front.update(
             f"[dim]English context:[/dim]\n[cyan]{card['question_en']}[/cyan]\n\n"
             f"[dim]Answer context:[/dim]\n[dim]{card['answer_en']}[/dim]"
         )
-        self.query_one("#vocab-back",  Static).update("")
-        self.query_one("#btn-flip",    Button).display = True
-        self.query_one("#vocab-rate",  Horizontal).display = False
+        self._w_vocab_back.update("")
+        self._w_btn_flip.display = True
+        self._w_vocab_rate.display = False
 
     def _flip(self) -> None:
         card = self.cards[self.idx]
-        self.query_one("#vocab-back", Static).update(
+        self._w_vocab_back.update(
             f"\n[bold]Hungarian keyword:[/bold]\n"
             f"[bold white]{card['keyword_hu']}[/bold white]"
         )
-        self.query_one("#btn-flip",   Button).display = False
-        self.query_one("#vocab-rate", Horizontal).display = True
+        self._w_btn_flip.display = False
+        self._w_vocab_rate.display = True
 
     def _next(self, is_correct: bool) -> None:
         card = self.cards[self.idx]
         record_vocab_attempt(self.app.progress, card["keyword_hu"], is_correct)
-        save_progress(self.app.progress, PROGRESS_FILE)
+        self.app.mark_dirty()
         self.total += 1
         if is_correct:
             self.correct += 1
@@ -1494,7 +1666,7 @@ class VocabScreen(Screen):
         if self.idx >= len(self.cards):
             pct = self.correct / self.total * 100 if self.total else 0
             record_session(self.app.progress, "vocab", self.correct, self.total, self.topic)
-            save_progress(self.app.progress, PROGRESS_FILE)
+            self.app.schedule_save()
             self.notify(f"Vocab done!  {self.correct}/{self.total} ({pct:.0f}%)")
             self.app.pop_screen()
         else:
@@ -1531,44 +1703,67 @@ class StatsScreen(Screen):
             yield Button("⌂ Home  [Esc]", id="btn-back", variant="warning")
         yield Footer()
 
-    def on_mount(self) -> None:
+    def on_screen_resume(self) -> None:
+        # Installed once and re-shown, so refresh on every visit, not on mount
         self._refresh_stats()
 
     def _refresh_stats(self) -> None:
+        # Re-opening the screen with unchanged progress reuses the last render
+        key = (self.app.progress_version, datetime.date.today())
+        if self.app.stats_cache[0] == key:
+            self.query_one("#stats-content", Static).update(self.app.stats_cache[1])
+            return
         progress = self.app.progress
         sessions = progress.get("sessions", [])
         q_data = progress.get("questions", {})
         srs_data = progress.get("srs", {})
-        lines: list = []
+        # Assembled as styled Text segments, so no markup has to be parsed
+        text = Text()
+        add = text.append
 
-        lines.append("[bold]Study Statistics — Tanulási Statisztika[/bold]")
-        lines.append("═" * 50)
-        lines.append(f"\n[bold]Total Sessions:[/bold]  {len(sessions)}")
+        add("Study Statistics — Tanulási Statisztika", "bold")
+        add("\n" + "═" * 50 + "\n")
+        add("\nTotal Sessions:", "bold")
+        add(f"  {len(sessions)}\n")
 
         streak = study_streak(progress)
-        lines.append(f"[bold]Study Streak:[/bold]    [green]{streak} day(s)[/green]")
+        add("Study Streak:", "bold")
+        add("    ")
+        add(f"{streak} day(s)", "green")
+        add("\n")
 
+        # One pass over sessions for the unique days and both history tails
         session_dates: set = set()
+        exam_sessions: deque = deque(maxlen=6)
+        recent_sessions: deque = deque(maxlen=10)
+        dget = dict.get
+        add_date = session_dates.add
+        add_exam = exam_sessions.append
+        add_recent = recent_sessions.append
         for s in sessions:
-            try:
-                session_dates.add(datetime.datetime.fromisoformat(s["date"]).date())
-            except (ValueError, KeyError):
-                pass
-        lines.append(f"[bold]Unique Days:[/bold]     {len(session_dates)}")
-        if sessions:
-            try:
-                last = datetime.datetime.fromisoformat(sessions[-1]["date"])
-                lines.append(f"[bold]Last Session:[/bold]    {last.strftime('%Y-%m-%d %H:%M')}")
-            except (ValueError, KeyError):
-                pass
-
-        lines.append("\n[bold]Per-Topic Accuracy[/bold]")
-        lines.append("─" * 50)
+            dt = session_datetime(s["date"]) if "date" in s else None
+            if dt is not None:
+                add_date(dt.date())
+            if dget(s, "mode") == "exam":
+                add_exam((s, dt))
+            add_recent((s, dt))
+        add("Unique Days:", "bold")
+        add(f"     {len(session_dates)}\n")
+        if recent_sessions:
+            last = recent_sessions[-1][1]
+            if last is not None:
+                add("Last Session:", "bold")
+                add(f"    {last.strftime('%Y-%m-%d %H:%M')}\n")
+
+        add("\nPer-Topic Accuracy", "bold")
+        add(f"\n{_RULE}\n")
         recommend_topic = None
         worst_acc = 1.0
         for t in range(1, 7):
-            c, a = topic_accuracy(progress, t)
-            lines.append(f"  T{t}  {accuracy_bar(c, a, 20)}  {TOPIC_SHORT[t]}  ({c}/{a})")
+            c, a = self.app.topic_stats[t]
+            add(f"  T{t}  ")
+            text.append_text(accuracy_bar_text(c, a, 20))
+            add(f"  {TOPIC_SHORT[t]}  ({c}/{a})\n")
             if a > 0:
                 acc = c / a
                 if acc < worst_acc:
@@ -1579,106 +1774,123 @@ class StatsScreen(Screen):
                 recommend_topic = t
 
         if srs_data:
-            today = datetime.date.today().isoformat()
-            due_today = sum(
-                1 for e in srs_data.values()
-                if not e.get("due") or e["due"] <= today
-            )
-            avg_ivl = sum(e.get("interval", 0) for e in srs_data.values()) / len(srs_data)
-            lines.append("\n[bold]Spaced Repetition (SRS)[/bold]")
-            lines.append("─" * 50)
-            lines.append(f"  Cards tracked:  {len(srs_data)}")
-            lines.append(f"  Due today:      [yellow]{due_today}[/yellow]")
-            lines.append(f"  Avg interval:   {avg_ivl:.1f} days")
-
-        exam_sessions = [s for s in sessions if s.get("mode") == "exam"]
+            due_today = self.app.srs_due_count()
+            avg_ivl = self.app.srs_interval_sum / len(srs_data)
+            add("\nSpaced Repetition (SRS)", "bold")
+            add(f"\n{_RULE}\n")
+            add(f"  Cards tracked:  {len(srs_data)}\n")
+            add("  Due today:      ")
+            add(str(due_today), "yellow")
+            add(f"\n  Avg interval:   {avg_ivl:.1f} days\n")
+
         if exam_sessions:
-            lines.append("\n[bold]Mock Exam History[/bold]")
-            lines.append("─" * 50)
-            for es in exam_sessions[-6:]:
-                try:
-                    dt = datetime.datetime.fromisoformat(es["date"]).strftime("%Y-%m-%d")
-                except (ValueError, KeyError):
-                    dt = "?"
-                pts = es.get("score", 0)
-                status = "[green]PASSED[/green]" if pts >= 16 else "[red]FAILED[/red]"
-                lines.append(f"  {dt}  {pts:.1f}/30  {status}")
-
-        lines.append("\n[bold]Most Missed Questions[/bold]")
-        lines.append("─" * 50)
-        missed = sorted(
-            [e for e in q_data.values() if e.get("attempts", 0) > 0 and e.get("accuracy", 1.0) < 0.6],
-            key=lambda x: x.get("accuracy", 0),
-        )
+            add("\nMock Exam History", "bold")
+            add(f"\n{_RULE}\n")
+            for es, es_dt in exam_sessions:
+                dt = es_dt.strftime("%Y-%m-%d") if es_dt else "?"
+                pts = dget(es, "score", 0)
+                add(f"  {dt}  {pts:.1f}/30  ")
+                if pts >= 16:
+                    add("PASSED", "green")
+                else:
+                    add("FAILED", "red")
+                add("\n")
+
+        # One pass over question entries for both the missed and leech lists
+        missed: list = []
+        leech_entries: list = []
+        # Accuracy is pulled out once per entry and carried in the tuple, so
+        # the selection compares plain floats; the index keeps ties stable.
+        for i, e in enumerate(q_data.values()):
+            if dget(e, "attempts", 0) > 0:
+                acc = dget(e, "accuracy", 1.0)
+                if acc < 0.6:
+                    missed.append((acc, i, e))
+            if dget(e, "is_leech"):
+                leech_entries.append(e)
+        # Only the five worst are shown: a partial selection, not a full sort
+        missed = heapq.nsmallest(5, missed)
+
+        add("\nMost Missed Questions", "bold")
+        add(f"\n{_RULE}\n")
         if missed:
-            for m in missed[:5]:
-                acc = m.get("accuracy", 0) * 100
-                t = m.get("topic", "?")
-                qtext = m.get("question_hu", "?")[:55]
-                lines.append(f"  [red]{acc:.0f}%[/red]  [T{t}]  {qtext}")
+            for acc, _, m in missed:
+                acc *= 100
+                t = dget(m, "topic", "?")
+                qtext = dget(m, "question_hu", "?")[:55]
+                add("  ")
+                add(f"{acc:.0f}%", "red")
+                add(f"  [T{t}]  {qtext}\n")
         else:
-            lines.append("  [green]No frequently missed questions — great work![/green]")
+            add("  ")
+            add("No frequently missed questions — great work!", "green")
+            add("\n")
 
         # Enhancement 2: Leech Cards section
-        leech_entries = [
-            entry for entry in q_data.values() if entry.get("is_leech")
-        ]
-        lines.append("\n[bold red]Leech Cards[/bold red]  [dim](wrong 5x in a row)[/dim]")
-        lines.append("─" * 50)
+        add("\nLeech Cards", "bold red")
+        add("  ")
+        add("(wrong 5x in a row)", "dim")
+        add(f"\n{_RULE}\n")
         if leech_entries:
             display = leech_entries[:10]
             for le in display:
-                qtext = le.get("question_hu", "?")[:60]
-                lines.append(f"  [red]•[/red] {qtext}")
+                qtext = dget(le, "question_hu", "?")[:60]
+                add("  ")
+                add("•", "red")
+                add(f" {qtext}\n")
             if len(leech_entries) > 10:
-                lines.append(f"  [dim]…and {len(leech_entries) - 10} more[/dim]")
+                add("  ")
+                add(f"…and {len(leech_entries) - 10} more", "dim")
+                add("\n")
         else:
-            lines.append("  [green]No leeches — great consistency![/green]")
+            add("  ")
+            add("No leeches — great consistency!", "green")
+            add("\n")
 
         # Enhancement 6: Recent Sessions chart
-        recent_sessions = sessions[-10:][::-1]  # last 10, newest first
         if recent_sessions:
-            lines.append("\n[bold]Recent Sessions[/bold]")
-            lines.append("─" * 50)
-            for sess in recent_sessions:
-                try:
-                    date_str = datetime.datetime.fromisoformat(sess["date"]).strftime("%Y-%m-%d")
-                except (ValueError, KeyError):
-                    date_str = "?"
-                mode_label = sess.get("mode", "?").title()
-                topic_val = sess.get("topic", "")
+            add("\nRecent Sessions", "bold")
+            add(f"\n{_RULE}\n")
+            for sess, sess_dt in reversed(recent_sessions):  # last 10, newest first
+                date_str = sess_dt.strftime("%Y-%m-%d") if sess_dt else "?"
+                mode = dget(sess, "mode", "?")
+                mode_label = mode.title()
+                topic_val = dget(sess, "topic", "")
                 if topic_val:
                     mode_display = f"{mode_label} — T{topic_val}"
                 else:
                     mode_display = mode_label
-                raw_score = sess.get("score", 0)
-                total_val = sess.get("total", 1) or 1
+                raw_score = dget(sess, "score", 0)
+                total_val = dget(sess, "total", 1) or 1
                 # Normalise score to 0-100 percent
-                if sess.get("mode") == "exam":
+                if mode == "exam":
                     # exam score is already points out of 30
                     pct_int = int(raw_score / 30 * 100)
                 else:
                     pct_int = int(raw_score / total_val * 100)
                 pct_int = max(0, min(100, pct_int))
                 filled = round(pct_int / 10)
-                bar = "█" * filled + "░" * (10 - filled)
+                bar = _FULL_BAR[:filled] + _EMPTY_BAR[:10 - filled]
                 if pct_int >= 80:
                     color = "green"
                 elif pct_int >= 60:
                     color = "yellow"
                 else:
                     color = "red"
-                lines.append(
-                    f"  {date_str}  {mode_display:<16}  "
-                    f"[{color}]{bar}[/{color}]  [{color}]{pct_int}%[/{color}]"
-                )
+                add(f"  {date_str}  {mode_display:<16}  ")
+                add(bar, color)
+                add("  ")
+                add(f"{pct_int}%", color)
+                add("\n")
 
         if recommend_topic:
             tname = TOPIC_SHORT.get(recommend_topic, f"Topic {recommend_topic}")
-            lines.append(f"\n[bold cyan]Recommendation:[/bold cyan]  "
-                         f"Topic {recommend_topic}: {tname}")
+            add("\nRecommendation:", "bold cyan")
+            add(f"  Topic {recommend_topic}: {tname}\n")
 
-        self.query_one("#stats-content", Static).update("\n".join(lines))
+        text.rstrip()
+        self.app.stats_cache = (key, text)
+        self.query_one("#stats-content", Static).update(text)
 
     def action_go_back(self) -> None:
         self.app.pop_screen()
@@ -1808,7 +2020,7 @@ class StudyGuideScreen(Screen):
                 "",
                 hu_intro,
                 "",
-                "─" * 44,
+                _RULE44,
                 "",
             ]
             en_lines += [
@@ -1816,7 +2028,7 @@ class StudyGuideScreen(Screen):
                 "",
                 en_intro,
                 "",
-                "─" * 44,
+                _RULE44,
                 "",
             ]
 
@@ -1843,8 +2055,8 @@ class StudyGuideScreen(Screen):
                     f"  [green]{works_en}[/green]",
                     "",
                 ]
-            hu_lines += ["─" * 44, ""]
-            en_lines += ["─" * 44, ""]
+            hu_lines += [_RULE44, ""]
+            en_lines += [_RULE44, ""]
 
         # ── All Q&A pairs ─────────────────────────────────────────────────────
         hu_lines += ["[bold yellow]══ KÉRDÉSEK ÉS VÁLASZOK ══[/bold yellow]", ""]
@@ -1852,10 +2064,7 @@ class StudyGuideScreen(Screen):
 
         for i, q in enumerate(self.questions, 1):
             diff = {1: "★", 2: "★★", 3: "★★★"}.get(q.get("difficulty", 1), "★")
-            kws = q.get("keywords_hu", [])
-            if isinstance(kws, str):
-                kws = [k.strip() for k in kws.split(",") if k.strip()]
-            kw_str = "  ·  ".join(f"[magenta]{k}[/magenta]" for k in kws)
+            kw_str = "  ·  ".join(f"[magenta]{k}[/magenta]" for k in q["keywords_hu"])
 
             hu_lines += [
                 f"[bold cyan]K{i:02d}[/bold cyan]  [yellow]{diff}[/yellow]",
@@ -1865,7 +2074,7 @@ class StudyGuideScreen(Screen):
             ]
             if kw_str:
                 hu_lines.append(f"[dim]Kulcsszavak:  {kw_str}[/dim]")
-            hu_lines += ["", "─" * 44, ""]
+            hu_lines += ["", _RULE44, ""]
 
             en_lines += [
                 f"[bold cyan]Q{i:02d}[/bold cyan]  [yellow]{diff}[/yellow]",
@@ -1875,7 +2084,7 @@ class StudyGuideScreen(Screen):
             ]
             if kw_str:
                 en_lines.append(f"[dim]Keywords:  {kw_str}[/dim]")
-            en_lines += ["", "─" * 44, ""]
+            en_lines += ["", _RULE44, ""]
 
         self.query_one("#guide-hu-content", Static).update("\n".join(hu_lines))
         self.query_one("#guide-en-content", Static).update("\n".join(en_lines))
@@ -1886,17 +2095,17 @@ class StudyGuideScreen(Screen):
         self.app.pop_screen()
 
     def action_launch_learn(self) -> None:
-        pool = list(get_questions_for_topic(self.app.questions, self.topic))
+        pool = self.app.questions_by_topic[self.topic]
         qs = weighted_sample(pool, 20, self.app.progress)
         self.app.push_screen(LearnScreen(qs, self.topic))
 
     def action_launch_quiz(self) -> None:
-        pool = list(get_questions_for_topic(self.app.questions, self.topic))
+        pool = self.app.questions_by_topic[self.topic]
         qs = weighted_sample(pool, 20, self.app.progress)
         self.app.push_screen(QuizScreen(qs, "quiz", topic=self.topic))
 
     def action_launch_mc(self) -> None:
-        pool = list(get_questions_for_topic(self.app.questions, self.topic))
+        pool = self.app.questions_by_topic[self.topic]
         qs = weighted_sample(pool, 20, self.app.progress)
         self.app.push_screen(MultiChoiceScreen(qs, self.topic))
 
@@ -2004,6 +2213,9 @@ class StudyApp(App):
     }
     #rating-row   { height: 3; margin-top: 1; }
     #quiz-buttons { height: 3; margin-top: 1; }
+    #quiz-header-row { height: auto; }
+    #quiz-header     { width: auto; }
+    #quiz-timer      { width: auto; padding-left: 2; }
     #vocab-rate   { height: 3; margin-top: 1; align: center middle; }
 
     /* ── Multiple choice ── */
@@ -2085,13 +2297,156 @@ class StudyApp(App):
     def __init__(self) -> None:
         super().__init__()
         self.questions = load_questions(QUESTIONS_FILE)
+        # load_questions() leaves keywords_hu as a list; pre-render the
+        # keyword strings the Learn reveal and Quiz hint show, and the
+        # truncated answer used as an MC distractor
+        for q in self.questions:
+            kws = q["keywords_hu"]
+            q["_kws_rich"] = "  ".join(f"[bold magenta]{k}[/bold magenta]" for k in kws)
+            q["_kws_masked"] = "   ".join(mask_keyword(k) for k in kws)
+            a = q["answer_hu"]
+            q["_answer_short"] = a[:70] + "…" if len(a) > 72 else a
+        # Topic pools are shared read-only; screens copy before reordering
+        self.questions_by_topic = {
+            t: [q for q in self.questions if q["topic"] == t] for t in range(1, 7)
+        }
         self.progress = load_progress(PROGRESS_FILE)
+        # Running per-topic [correct, attempts]; kept current by record_attempt()
+        self.topic_stats = topic_totals(self.progress)
+        # Dashboard counters, adjusted by update_leech() / update_srs()
+        self.leech_count = sum(
+            1 for entry in self.progress.get("questions", {}).values()
+            if entry.get("is_leech")
+        )
+        self._due_count = 0
+        self._due_day = None  # date _due_count was computed for
+        # Stats-panel SRS aggregates over tracked cards, kept by update_srs()
+        self.srs_interval_sum = sum(
+            e.get("interval", 0) for e in self.progress.get("srs", {}).values()
+        )
+        self._srs_due = 0
+        self._srs_due_day = None
+        self.stats_cache = (None, None)  # ((progress version, date), stats Text)
+        self._save_timer = None
+        # One writer thread, so saves never overlap; the future of the last
+        # write lets on_unmount wait for it before the final save
+        self._save_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._save_future = None
+        self._progress_dirty = False
+        # Bumped on every progress change (each one goes through mark_dirty())
+        self.progress_version = 0
         self.selected_topic: int = None
 
+    def record_attempt(self, q: dict, score: float) -> None:
+        """Record an attempt in progress and in the cached per-topic totals."""
+        record_attempt(self.progress, q, score)
+        tot = self.topic_stats.get(q["topic"])
+        if tot is not None:
+            tot[1] += 1
+            if score >= 0.6:
+                tot[0] += 1
+
+    def update_leech(self, qid: str, correct: bool) -> None:
+        """update_leech() on app progress, keeping leech_count current."""
+        entry = self.progress.get("questions", {}).get(qid)
+        was_leech = bool(entry and entry.get("is_leech"))
+        update_leech(self.progress, qid, correct)
+        self.leech_count += self.progress["questions"][qid]["is_leech"] - was_leech
+
+    def update_srs(self, qid: str, grade: int) -> None:
+        """update_srs() on app progress, keeping the due-today counts current."""
+        entry = self.progress.get("srs", {}).get(qid)
+        today = datetime.date.today().isoformat()
+        was_due = entry is None or not entry.get("due") or entry["due"] <= today
+        old_interval = entry.get("interval", 0) if entry else 0
+        update_srs(self.progress, qid, grade)
+        self.srs_interval_sum += self.progress["srs"][qid]["interval"] - old_interval
+        if was_due:
+            self._due_count -= 1  # rescheduled at least a day ahead
+            if entry is not None:
+                self._srs_due -= 1
+
+    def due_count(self) -> int:
+        """Number of questions due for SRS review today (recounted once per day)."""
+        today = datetime.date.today()
+        if self._due_day != today:
+            self._due_count = len(get_due_questions(self.progress, self.questions))
+            self._due_day = today
+        return self._due_count
+
+    def srs_due_count(self) -> int:
+        """Number of tracked SRS cards due today (recounted once per day)."""
+        today = datetime.date.today()
+        if self._srs_due_day != today:
+            iso = today.isoformat()
+            self._srs_due = sum(
+                1 for e in self.progress.get("srs", {}).values()
+                if not e.get("due") or e["due"] <= iso
+            )
+            self._srs_due_day = today
+        return self._srs_due
+
+    def reusable_screen(self, name: str, factory) -> str:
+        """Install a session-independent screen on first use and return its name.
+
+        Installed screens survive being popped, so their widget tree is
+        composed once instead of on every visit.
+        """
+        if not self.is_screen_installed(name):
+            self.install_screen(factory(), name)
+        return name
+
+    def mark_dirty(self) -> None:
+        """Note a progress change; it is written by the next periodic flush."""
+        self.progress_version += 1
+        self._progress_dirty = True
+
+    def schedule_save(self) -> None:
+        """Mark progress dirty and save it about a second from now (session ends)."""
+        self.mark_dirty()
+        if self._save_timer is not None:
+            self._save_timer.stop()
+        self._save_timer = self.set_timer(1.0, self._flush_save)
+
+    async def _flush_save(self) -> None:
+        """Write dirty progress on a worker thread so the UI never blocks on disk.
+
+        Progress is encoded here on the UI thread, so the worker only ever
+        sees an immutable snapshot while screens keep mutating the dict.
+        Progress stays dirty until the write succeeds; failures are reported
+        with a notification and retried by the next flush.
+        """
+        if not self._progress_dirty:
+            return
+        if self._save_future is not None and not self._save_future.done():
+            # Previous write still running; try again later
+            self._save_timer = self.set_timer(1.0, self._flush_save)
+            return
+        version = self.progress_version
+        payload = encode_progress(self.progress)
+        self._save_future = self._save_executor.submit(write_progress, payload, PROGRESS_FILE)
+        try:
+            await asyncio.wrap_future(self._save_future)
+        except OSError as exc:
+            self.notify(f"Could not save progress: {exc}", severity="error")
+            return
+        # Changes made while the write ran still need their own save
+        if self.progress_version == version:
+            self._progress_dirty = False
+
     def on_mount(self) -> None:
+        # Per-answer changes only mark progress dirty; this bounds what a crash loses
+        self.set_interval(30, self._flush_save)
         self.push_screen(HomeScreen())
 
     def on_unmount(self) -> None:
+        if self._save_timer is not None:
+            self._save_timer.stop()
+        # Let an in-flight background write finish first; both go through
+        # the same temp file, and the final save must land last
+        if self._save_future is not None:
+            concurrent.futures.wait([self._save_future])
+        self._save_executor.shutdown()
         save_progress(self.progress, PROGRESS_FILE)
 
 
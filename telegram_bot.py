@@ -3,17 +3,24 @@
 Hungarian Cultural Knowledge Exam - Telegram Study Bot
 """
 
-import json, os, sys, random, hashlib, difflib, datetime
+import json, os, sys, random, hashlib, difflib, datetime, functools, bisect, itertools
+from collections import Counter
 from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, CallbackQueryHandler, MessageHandler,
-    PicklePersistence, ContextTypes, filters,
+    PicklePersistence, PersistenceInput, ContextTypes, filters,
 )
 
+try:
+    from rapidfuzz import fuzz as _rf_fuzz, process as _rf_process  # optional: C++ fuzzy matching
+except ImportError:
+    _rf_fuzz = _rf_process = None
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 QUESTIONS_FILE = os.path.join(BASE_DIR, "questions.json")
 PERSISTENCE_FILE = os.path.join(BASE_DIR, "bot_persistence.pkl")
+PERSIST_INTERVAL = 60  # seconds between pickle writes while users are active
 
 TOPIC_NAMES: dict[int, str] = {
     1: "Nemzeti jelképek és ünnepek",
@@ -32,6 +39,9 @@ TOPIC_EMOJI: dict[int, str] = {
 EXAM_PASS_THRESHOLD = 16.0
 EXAM_MAX_POINTS = 30.0
 WEAK_THRESHOLD = 0.60
+ELLIPSIS = "\u2026"  # marks a truncated answer on a multiple-choice button
+ZWSP = "\u200b"      # zero-width space closing an untruncated button label
+MC_LABELS = "ABCD"
 ACCENT_MAP = str.maketrans({
     "\u00e1": "a", "\u00c1": "A",
     "\u00e9": "e", "\u00c9": "E",
@@ -45,70 +55,152 @@ ACCENT_MAP = str.maketrans({
 })
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_text(text):
     """Remove accents and lowercase text for comparison purposes."""
-    return text.translate(ACCENT_MAP).lower().strip()
+    text = text.strip()  # strip first so lower() runs on the shorter string
+    if text.isascii():
+        return text.lower()  # nothing for ACCENT_MAP to replace
+    return text.translate(ACCENT_MAP).lower()
 
 
 def question_id(question_hu):
-    """Generate a stable ID for a question using MD5 hash of the Hungarian text."""
+    """Generate a stable ID for a question: 64-bit BLAKE2b of the Hungarian text."""
+    return hashlib.blake2b(question_hu.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def legacy_question_id(question_hu):
+    """The pre-BLAKE2b question ID (MD5 hex), used only to migrate saved data."""
     return hashlib.md5(question_hu.encode("utf-8")).hexdigest()
 
 
-def fuzzy_match(user_input, keyword, threshold=0.75):
+def any_close(chunks, target, threshold):
+    """Return True if any of *chunks* reaches *threshold* similarity (0-1) to *target*."""
+    if _rf_process is not None:
+        # One C call scores every chunk; rapidfuzz ratios run 0-100
+        best = _rf_process.extractOne(target, chunks, scorer=_rf_fuzz.ratio, score_cutoff=threshold * 100)
+        return best is not None
+    # One matcher for all chunks: set_seq2 indexes the target once, and
+    # set_seq1 swaps only the chunk. The cheap upper bounds run first.
+    matcher = difflib.SequenceMatcher(None, "", target)
+    set_seq1 = matcher.set_seq1
+    real_quick_ratio, quick_ratio, ratio = matcher.real_quick_ratio, matcher.quick_ratio, matcher.ratio
+    for chunk in chunks:
+        set_seq1(chunk)
+        if real_quick_ratio() >= threshold and quick_ratio() >= threshold and ratio() >= threshold:
+            return True
+    return False
+
+
+def window_starts(text, target, size, threshold):
+    """
+    Yield start offsets of the *size*-character windows of *text* that can
+    still reach *threshold* against *target*.
+
+    A window's ratio is bounded by the characters it shares with *target*
+    (difflib's quick_ratio). The shared count is updated as the window
+    slides, so the whole text is scanned once per size and no window that
+    could match is skipped.
+    """
+    need = {}
+    for ch in target:
+        need[ch] = need.get(ch, 0) + 1
+    have = {}
+    shared = 0
+    length = size + len(target)
+    for i, ch in enumerate(text):
+        count = have.get(ch, 0) + 1
+        have[ch] = count
+        if count <= need.get(ch, 0):
+            shared += 1
+        start = i - size + 1
+        if start < 0:
+            continue
+        if 2.0 * shared >= threshold * length:
+            yield start
+        out = text[start]
+        count = have[out]
+        if count <= need.get(out, 0):
+            shared -= 1
+        have[out] = count - 1
+
+
+def fuzzy_match(user_input, keyword, threshold=0.75, norm_kw=None, kw_words=None):
     """
     Check whether *keyword* appears in *user_input* using fuzzy matching.
 
+    *norm_kw* and *kw_words* may carry the keyword already normalised and
+    split (see the ``_kw_norm`` / ``_kw_norm_words`` fields set by
+    load_questions), so static keywords are not re-normalised per answer.
+
     Strategy:
     1. Exact substring match (after accent-normalisation) -- instant pass.
-    2. Sliding-window fuzzy match using difflib.SequenceMatcher.
+    2. Sliding-window fuzzy match using rapidfuzz (or difflib.SequenceMatcher
+       when rapidfuzz is not installed).
        The window slides over the user input in word-sized chunks and also
        in character-sized chunks equal to the keyword length +/- 3.
 
     Returns True if a sufficiently close match is found.
     """
     norm_input = normalize_text(user_input)
-    norm_kw = normalize_text(keyword)
+    if norm_kw is None:
+        norm_kw = normalize_text(keyword)
+    if kw_words is None:
+        kw_words = norm_kw.split()
+    return match_normalized(norm_input, norm_input.split(), Counter(norm_input), norm_kw, kw_words, threshold)
+
 
+def match_normalized(norm_input, input_words, input_counts, norm_kw, kw_words, threshold=0.75):
+    """
+    fuzzy_match() on an input already normalised, split into words and
+    counted by character, so score_answer prepares it once for all keywords.
+    """
     # Exact substring
     if norm_kw in norm_input:
         return True
 
-    # Word-level check
-    input_words = norm_input.split()
-    kw_words = norm_kw.split()
+    # Prefilter: no window can share more characters with the keyword than the
+    # whole input does (spaces counted generously, as word windows re-join
+    # with single spaces). If even that bound misses, skip every window.
+    kw_spaces = norm_kw.count(" ")
+    shared = kw_spaces + sum(
+        min(input_counts[ch], n) for ch, n in Counter(norm_kw).items() if ch != " "
+    )
+    if 2 * shared < threshold * (shared + len(norm_kw)):
+        return False
 
+    # Word-level check
     # Single-word keyword: check against each input word
     if len(kw_words) == 1:
-        for word in input_words:
-            ratio = difflib.SequenceMatcher(None, word, norm_kw).ratio()
-            if ratio >= threshold:
-                return True
+        if any_close(input_words, norm_kw, threshold):
+            return True
 
     # Multi-word keyword: sliding window of same word count
     if len(kw_words) > 1:
-        for i in range(len(input_words) - len(kw_words) + 1):
-            window = " ".join(input_words[i : i + len(kw_words)])
-            ratio = difflib.SequenceMatcher(None, window, norm_kw).ratio()
-            if ratio >= threshold:
-                return True
+        n = len(kw_words)
+        windows = (" ".join(input_words[i : i + n]) for i in range(len(input_words) - n + 1))
+        if any_close(windows, norm_kw, threshold):
+            return True
 
     # Character-level sliding window
     kw_len = len(norm_kw)
-    for window_size in range(max(1, kw_len - 3), kw_len + 4):
-        for i in range(len(norm_input) - window_size + 1):
-            chunk = norm_input[i : i + window_size]
-            ratio = difflib.SequenceMatcher(None, chunk, norm_kw).ratio()
-            if ratio >= threshold:
-                return True
-
-    return False
+    chunks = (
+        norm_input[i : i + window_size]
+        for window_size in range(max(1, kw_len - 3), kw_len + 4)
+        # a ratio is at most 2*min(len)/sum(len), so some sizes can never pass
+        if 2 * min(window_size, kw_len) >= threshold * (window_size + kw_len)
+        for i in window_starts(norm_input, norm_kw, window_size, threshold)
+    )
+    return any_close(chunks, norm_kw, threshold)
 
 
-def score_answer(user_input, keywords):
+def score_answer(user_input, keywords, kw_norm=None, kw_words=None):
     """
     Score the user's answer against the list of expected keywords.
 
+    *kw_norm* and *kw_words* are the optional per-keyword precomputations
+    (see fuzzy_match).
+
     Returns:
         (score, matched_list, missed_list)
         where score is a float between 0.0 and 1.0
@@ -116,11 +208,21 @@ def score_answer(user_input, keywords):
     if not keywords:
         return (1.0, [], [])
 
+    if kw_norm is None:
+        kw_norm = [normalize_text(kw) for kw in keywords]
+    if kw_words is None:
+        kw_words = [k.split() for k in kw_norm]
+
+    # The answer is normalised, split and counted once, not once per keyword
+    norm_input = normalize_text(user_input)
+    input_words = norm_input.split()
+    input_counts = Counter(norm_input)
+
     matched = []
     missed = []
 
-    for kw in keywords:
-        if fuzzy_match(user_input, kw):
+    for kw, norm_kw, words in zip(keywords, kw_norm, kw_words):
+        if match_normalized(norm_input, input_words, input_counts, norm_kw, words):
             matched.append(kw)
         else:
             missed.append(kw)
@@ -145,6 +247,7 @@ def update_srs(progress: dict, qid: str, quality: int) -> None:
     """Update SRS scheduling using the SM-2 algorithm."""
     srs = progress.setdefault("srs", {})
     card = srs.setdefault(qid, {"interval": 1, "repetitions": 0, "easiness": 2.5, "due": None})
+    old_due = card["due"]
     ef = card["easiness"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
     card["easiness"] = max(1.3, ef)
     if quality < 3:
@@ -158,45 +261,146 @@ def update_srs(progress: dict, qid: str, quality: int) -> None:
         card["repetitions"] += 1
     due = datetime.date.today() + datetime.timedelta(days=card["interval"])
     card["due"] = due.isoformat()
+    mark_srs_dirty(progress, qid, old_due, card["due"])
+
+
+# --- Due/weak index ---
+# progress["_index"] keeps the qids that get_due_questions / get_weak_questions
+# select, updated by update_srs and record_attempt, so reads need no sweep over
+# every card. It is rebuilt lazily when missing (older saved progress) or built
+# for a different question set.
+
+def build_index(progress: dict, bot_data: dict) -> dict:
+    """Rebuild progress["_index"] from the SRS cards and question stats."""
+    srs_get = progress.get("srs", {}).get
+    pq_get = progress.get("questions", {}).get
+    due_by_date: dict = {}
+    unseen, weak = set(), set()
+    threshold = WEAK_THRESHOLD
+    for qid in bot_data["questions_by_id"]:
+        card = srs_get(qid)
+        if card is None:
+            unseen.add(qid)
+        else:
+            due_by_date.setdefault(card.get("due", "0000-00-00"), set()).add(qid)
+        entry = pq_get(qid)
+        if entry is None or entry.get("accuracy", 0.0) < threshold:
+            weak.add(qid)
+    index = {"corpus": bot_data["corpus_key"], "due_by_date": due_by_date,
+             "srs_unseen": unseen, "weak": weak}
+    progress["_index"] = index
+    return index
+
+
+def get_index(progress: dict, bot_data: dict) -> dict:
+    index = progress.get("_index")
+    if index is None or index["corpus"] != bot_data["corpus_key"]:
+        index = build_index(progress, bot_data)
+    return index
+
+
+def mark_srs_dirty(progress: dict, qid: str, old_due: Optional[str], new_due: str) -> None:
+    """Move *qid* to its new due date in the index (no-op until the index is built)."""
+    index = progress.get("_index")
+    if index is None:
+        return
+    by_date = index["due_by_date"]
+    if old_due is None:
+        index["srs_unseen"].discard(qid)
+    elif old_due in by_date:
+        by_date[old_due].discard(qid)
+        if not by_date[old_due]:
+            del by_date[old_due]
+    by_date.setdefault(new_due, set()).add(qid)
+
+
+def _due_ids(index: dict) -> set:
+    today = datetime.date.today().isoformat()
+    ids = set(index["srs_unseen"])
+    for day, day_ids in index["due_by_date"].items():
+        if day <= today:
+            ids |= day_ids
+    return ids
 
 
-def get_due_questions(progress: dict, questions: list) -> list:
+def get_due_questions(progress: dict, bot_data: dict) -> list:
     """Return questions due for SRS review today, including unseen cards."""
-    srs = progress.get("srs", {})
+    due = _due_ids(get_index(progress, bot_data))
+    return [q for qid, q in bot_data["questions_by_id"].items() if qid in due]
+
+
+def count_due_questions(progress: dict, bot_data: dict) -> int:
+    index = get_index(progress, bot_data)
     today = datetime.date.today().isoformat()
-    due_ids = {qid for qid, card in srs.items() if card.get("due", "0000-00-00") <= today}
-    seen_ids = set(srs.keys())
-    result = []
-    for q in questions:
-        qid = question_id(q["question_hu"])
-        if qid in due_ids or qid not in seen_ids:
-            result.append(q)
-    return result
+    return len(index["srs_unseen"]) + sum(
+        len(day_ids) for day, day_ids in index["due_by_date"].items() if day <= today
+    )
 
 
 # --- Progress helpers ---
 
 def init_progress() -> dict:
-    return {"questions": {}, "sessions": [], "srs": {}, "vocab": {}}
+    return {"questions": {}, "sessions": [], "srs": {}, "vocab": {}, "_ids": "blake2b"}
+
+
+def migrate_progress_ids(progress: dict, bot_data: dict) -> None:
+    """
+    Re-key progress saved with the old 32-char MD5 question IDs.
+
+    Keys are mapped through the loaded questions, or failing that through the
+    question text stored on the entry; keys that cannot be mapped are kept.
+    """
+    if progress.get("_ids") == "blake2b":
+        return
+    legacy = bot_data["legacy_ids"]
+    remap = {}
+    for key, entry in progress.get("questions", {}).items():
+        if len(key) == 32:
+            text = entry.get("question_hu")
+            new = legacy.get(key) or (question_id(text) if text and legacy_question_id(text) == key else None)
+            if new: remap[key] = new
+    for key in progress.get("srs", {}):
+        if len(key) == 32 and key in legacy:
+            remap.setdefault(key, legacy[key])
+    for field in ("questions", "srs"):
+        if field in progress:
+            progress[field] = {remap.get(k, k): v for k, v in progress[field].items()}
+    progress.pop("_index", None)  # keyed by the old IDs; rebuilt on next use
+    progress["_ids"] = "blake2b"
 
 
 def init_user_data() -> dict:
     return {
         "state": "home", "selected_topic": None,
         "session": {
-            "mode": None, "questions": [], "idx": 0,
+            "mode": None, "qids": [], "idx": 0,
             "score": 0.0, "options": [], "hint_used": False, "revealed": False,
         },
         "progress": init_progress(),
     }
 
 
+def get_topic_accuracy(progress: dict) -> dict:
+    """Return {topic: [accuracy sum, entry count]} over tracked questions, kept by record_attempt."""
+    acc = progress.get("_topic_acc")
+    if acc is None:
+        acc = {}
+        for e in progress.get("questions", {}).values():
+            slot = acc.setdefault(e.get("topic"), [0.0, 0])
+            slot[0] += e["accuracy"]
+            slot[1] += 1
+        progress["_topic_acc"] = acc
+    return acc
+
+
 def record_attempt(progress: dict, q: dict, score: float) -> None:
-    qid = question_id(q["question_hu"])
+    qid = q["_qid"]
+    is_new = qid not in progress["questions"]
     entry = progress["questions"].setdefault(qid, {
         "attempts": 0, "correct": 0, "last_seen": None,
         "accuracy": 0.0, "question_hu": q["question_hu"], "topic": q["topic"],
     })
+    old_accuracy = entry["accuracy"]
     entry["attempts"] += 1
     if score >= 0.6: entry["correct"] += 1
     entry["last_seen"] = datetime.datetime.now().isoformat()
@@ -207,6 +411,15 @@ def record_attempt(progress: dict, q: dict, score: float) -> None:
     else:
         entry["consecutive_wrong"] = entry.get("consecutive_wrong", 0) + 1
     entry["is_leech"] = entry.get("consecutive_wrong", 0) >= 5
+    topic_acc = progress.get("_topic_acc")
+    if topic_acc is not None:
+        slot = topic_acc.setdefault(entry.get("topic"), [0.0, 0])
+        slot[0] += entry["accuracy"] - old_accuracy
+        slot[1] += is_new
+    index = progress.get("_index")
+    if index is not None:
+        if entry["accuracy"] < WEAK_THRESHOLD: index["weak"].add(qid)
+        else: index["weak"].discard(qid)
 
 
 def record_session(progress: dict, mode: str, score: float, total: int, topic=None) -> None:
@@ -219,14 +432,19 @@ def get_questions_for_topic(questions: list, topic: int) -> list:
     return [q for q in questions if q.get("topic") == topic]
 
 
-def get_weak_questions(progress: dict, questions: list) -> list:
-    pq = progress.get("questions", {})
-    weak_qs = [
-        q for q in questions
-        if (lambda e: e is None or e.get("accuracy", 0.0) < WEAK_THRESHOLD)(pq.get(question_id(q["question_hu"])))
-    ]
+def get_weak_questions(progress: dict, bot_data: dict) -> list:
+    weak = get_index(progress, bot_data)["weak"]
+    pq_get = progress.get("questions", {}).get
+    # Accuracy is looked up once per question; the unique position keeps ties in
+    # file order and means the question dicts themselves are never compared
+    ranked = []
+    for pos, (qid, q) in enumerate(bot_data["questions_by_id"].items()):
+        if qid in weak:
+            e = pq_get(qid)
+            ranked.append((0.0 if e is None else e.get("accuracy", 0.0), pos, q))
     # Sort so worst-accuracy questions come first
-    return sorted(weak_qs, key=lambda q: progress["questions"].get(question_id(q["question_hu"]), {}).get("accuracy", 0.0))
+    ranked.sort()
+    return [q for _, _, q in ranked]
 
 
 # F2 — Weighted sampling
@@ -238,8 +456,7 @@ def weighted_sample(questions: list, n: int, progress: dict) -> list:
     pq = progress.get("questions", {})
     weights = []
     for q in questions:
-        qid = question_id(q["question_hu"])
-        accuracy = pq.get(qid, {}).get("accuracy", 0.5)
+        accuracy = pq.get(q["_qid"], {}).get("accuracy", 0.5)
         weight = 1.0 - min(accuracy, 0.9)
         weights.append(weight)
     k = min(n, len(questions))
@@ -275,15 +492,13 @@ def srs_forecast(srs_data: dict, n: int = 7) -> list:
     A question is due on day D if its due date <= (today + D days).isoformat().
     """
     today = datetime.date.today()
-    counts = []
-    for d in range(n):
-        target = (today + datetime.timedelta(days=d)).isoformat()
-        count = sum(
-            1 for card in srs_data.values()
-            if card.get("due", "9999-99-99") <= target
-        )
-        counts.append(count)
-    return counts
+    targets = [(today + datetime.timedelta(days=d)).isoformat() for d in range(n)]
+    # One pass over the cards: each lands on the first day whose date reaches
+    # its due date, and a running sum turns those into the cumulative counts
+    first_day = [0] * (n + 1)
+    for card in srs_data.values():
+        first_day[bisect.bisect_left(targets, card.get("due", "9999-99-99"))] += 1
+    return list(itertools.accumulate(first_day[:n]))
 
 
 # --- Keyboard builders ---
@@ -344,17 +559,21 @@ def hint_next_keyboard() -> InlineKeyboardMarkup:
 
 # --- Message formatters ---
 
-def format_question_text(q: dict, idx: int, total: int, mode_label: str = "") -> str:
-    label = f" | {mode_label}" if mode_label else ""
+def question_body(q: dict) -> str:
+    """The static part of a question message: topic line plus both texts."""
     tn = q["topic"]
     return (
-        f"<b>Question {idx + 1}/{total}{label}</b>\n"
-        f"<i>Topic {tn}: {TOPIC_NAMES[tn]}</i>\n\n"
+        f"<i>Topic {tn}: {TOPIC_NAMES.get(tn, '?')}</i>\n\n"
         f"<b>{q['question_hu']}</b>\n"
         f"<i>{q['question_en']}</i>"
     )
 
 
+def format_question_text(q: dict, idx: int, total: int, mode_label: str = "") -> str:
+    label = f" | {mode_label}" if mode_label else ""
+    return f"<b>Question {idx + 1}/{total}{label}</b>\n" + q["_qtext_static"]
+
+
 def format_answer_text(q: dict) -> str:
     kws = q.get("keywords_hu", [])
     kw_str = " | ".join(f"<code>{k}</code>" for k in kws) if kws else "<i>none</i>"
@@ -396,6 +615,25 @@ async def safe_edit(query, text, **kwargs):
         await query.message.reply_text(text, **kwargs)
 
 
+# Persistence runs with on_flush=True, so PTB only copies user_data in memory.
+# Handlers mark it dirty and flush_persistence writes the pickle at most once
+# per PERSIST_INTERVAL, plus right away when a session ends, instead of
+# rewriting the whole file for every changed user on every tick.
+def mark_dirty(context: ContextTypes.DEFAULT_TYPE, flush_now: bool = False) -> None:
+    context.bot_data["_persist_dirty"] = True
+    if flush_now:
+        context.job_queue.run_once(flush_persistence, 0)
+
+
+async def flush_persistence(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """JobQueue callback: write user data to disk if anything changed since the last write."""
+    if not context.bot_data.pop("_persist_dirty", False):
+        return
+    app = context.application
+    await app.update_persistence()
+    await app.persistence.flush()
+
+
 async def send_srs_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
     """JobQueue callback: send a daily SRS review reminder to the user."""
     job = context.job
@@ -420,6 +658,7 @@ async def send_srs_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.user_data: context.user_data.update(init_user_data())
     elif "progress" not in context.user_data: context.user_data["progress"] = init_progress()
+    mark_dirty(context)
     context.user_data["state"] = "home"
     chat_id = update.effective_chat.id
     context.user_data["chat_id"] = chat_id
@@ -437,6 +676,8 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.user_data: context.user_data.update(init_user_data())
+    sync_session(context.user_data, context.bot_data)
+    mark_dirty(context)
     await send_statistics(update.message.reply_text, context)
 
 
@@ -467,6 +708,7 @@ async def cmd_remind(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         )
         return
     context.user_data["reminder_hour"] = hour
+    mark_dirty(context)
     remove_job_if_exists(str(chat_id), context)
     context.job_queue.run_daily(
         send_srs_reminder,
@@ -503,15 +745,15 @@ async def send_statistics(reply_fn, context: ContextTypes.DEFAULT_TYPE) -> None:
         if d == (today - datetime.timedelta(days=i)).isoformat(): streak += 1
         else: break
     topic_lines = []
+    topic_acc = get_topic_accuracy(progress)
     for tid in range(1, 7):
-        entries = [e for e in pq.values() if e.get("topic") == tid]
-        if entries:
-            avg_acc = sum(e["accuracy"] for e in entries) / len(entries)
+        acc_sum, n = topic_acc.get(tid, (0.0, 0))
+        if n:
+            avg_acc = acc_sum / n
             topic_lines.append(f"T{tid} {TOPIC_EMOJI[tid]} {format_score_bar(avg_acc)} {avg_acc:.0%}")
         else:
             topic_lines.append(f"T{tid} {TOPIC_EMOJI[tid]} ░░░░░░░░░░ no data")
-    all_q: list = context.bot_data.get("questions", [])
-    srs_due = len(get_due_questions(progress, all_q))
+    srs_due = count_due_questions(progress, context.bot_data)
     # F3 — Leech count
     leech_count = sum(1 for e in pq.values() if e.get("is_leech", False))
     out = [
@@ -538,63 +780,103 @@ async def send_statistics(reply_fn, context: ContextTypes.DEFAULT_TYPE) -> None:
     await reply_fn("\n".join(out), parse_mode="HTML", reply_markup=main_menu_keyboard())
 
 
-def start_session(ud: dict, mode: str, questions: list) -> None:
-    random.shuffle(questions)
-    ud["session"] = {"mode": mode, "questions": questions, "idx": 0,
+def start_session(ud: dict, mode: str, qids: list, bot_data: dict) -> None:
+    """Start a session over *qids*, shuffled in place (callers pass a fresh list)."""
+    random.shuffle(qids)
+    # Only qids are kept per user (and pickled); questions resolve via bot_data
+    ud["session"] = {"mode": mode, "qids": qids, "idx": 0,
+                     "corpus": bot_data["corpus_key"],
                      "score": 0.0, "options": [], "hint_used": False, "revealed": False}
     ud["state"] = mode
 
 
-async def send_learn_card(reply_fn, ud: dict) -> None:
+def sync_session(ud: dict, bot_data: dict) -> None:
+    """Bring a restored session in line with the loaded question set.
+
+    Progress saved with MD5 question IDs is re-keyed first. Sessions saved by
+    older versions held full question dicts or MD5 qids; those become current
+    qids. If questions.json changed since the session started, qids that no
+    longer exist are dropped (keeping the position) so lookups cannot fail.
+    """
+    if "progress" in ud:
+        migrate_progress_ids(ud["progress"], bot_data)
+    sess = ud.get("session")
+    if not sess or sess.get("corpus") == bot_data["corpus_key"]:
+        return
+    by_id = bot_data["questions_by_id"]
+    legacy = bot_data["legacy_ids"]
+    qids = sess.pop("questions", None)
+    qids = [question_id(q["question_hu"]) for q in qids] if qids is not None else sess.get("qids", [])
+    qids = [legacy.get(qid, qid) for qid in qids]
+    idx = sess.get("idx", 0)
+    sess["idx"] = sum(1 for qid in qids[:idx] if qid in by_id)
+    sess["qids"] = [qid for qid in qids if qid in by_id]
+    sess["corpus"] = bot_data["corpus_key"]
+
+
+def current_question(ud: dict, bot_data: dict) -> dict:
     sess = ud["session"]
-    q = sess["questions"][sess["idx"]]
+    return bot_data["questions_by_id"][sess["qids"][sess["idx"]]]
+
+
+async def send_learn_card(reply_fn, ud: dict, bot_data: dict) -> None:
+    sess = ud["session"]
+    q = current_question(ud, bot_data)
     sess["revealed"] = False
-    await reply_fn(format_question_text(q, sess["idx"], len(sess["questions"]), "Learn"),
+    await reply_fn(format_question_text(q, sess["idx"], len(sess["qids"]), "Learn"),
                    reply_markup=reveal_keyboard(), parse_mode="HTML")
 
 
-async def send_mc_question(reply_fn, ud: dict, all_questions: list) -> None:
+async def send_mc_question(reply_fn, ud: dict, bot_data: dict) -> None:
     sess = ud["session"]
     idx = sess["idx"]
-    q = sess["questions"][idx]
+    q = current_question(ud, bot_data)
     correct_ans = q["answer_hu"]
-    wrong_pool = [x["answer_hu"] for x in all_questions if x["answer_hu"] != correct_ans]
-    opts = random.sample(wrong_pool, min(3, len(wrong_pool))) + [correct_ans]
+    # Draw four answers and drop the correct one if it came up: the first three
+    # left are a uniform sample of the wrong answers, without building that pool
+    answers = bot_data["all_answers"]
+    picks = random.sample(range(len(answers)), min(4, len(answers)))
+    wrong = [answers[i] for i in picks if answers[i] != correct_ans][:3]
+    if len(wrong) < 3:  # tiny question set, or the correct answer is duplicated
+        wrong_pool = [a for a in answers if a != correct_ans]
+        wrong = random.sample(wrong_pool, min(3, len(wrong_pool)))
+    opts = wrong + [correct_ans]
     random.shuffle(opts)
     sess["options"] = opts
-    text = format_question_text(q, idx, len(sess["questions"]), "Multiple Choice")
-    labels = ["A", "B", "C", "D"]
+    text = format_question_text(q, idx, len(sess["qids"]), "Multiple Choice")
     buttons = [[InlineKeyboardButton(
-        f"{labels[i]}) {opt[:50] + (chr(8230) if len(opt) > 50 else chr(8203))}",
+        f"{MC_LABELS[i]}) {opt[:50] + (ELLIPSIS if len(opt) > 50 else ZWSP)}",
         callback_data=f"mc:answer:{i}")] for i, opt in enumerate(opts)]
     await reply_fn(text, reply_markup=InlineKeyboardMarkup(buttons), parse_mode="HTML")
 
 
-async def send_quiz_question(reply_fn, ud: dict) -> None:
+async def send_quiz_question(reply_fn, ud: dict, bot_data: dict) -> None:
     sess = ud["session"]
     idx = sess["idx"]
-    q = sess["questions"][idx]
+    q = current_question(ud, bot_data)
     sess["hint_used"] = False
-    text = format_question_text(q, idx, len(sess["questions"]), "Quiz") + "\n\n<i>Type your answer below...</i>"
+    text = format_question_text(q, idx, len(sess["qids"]), "Quiz") + "\n\n<i>Type your answer below...</i>"
     await reply_fn(text, reply_markup=hint_next_keyboard(), parse_mode="HTML")
 
 
 async def finish_quiz(reply_fn, ud: dict, context: ContextTypes.DEFAULT_TYPE) -> None:
     sess = ud["session"]
-    total = len(sess["questions"])
+    total = len(sess["qids"])
     avg = sess["score"] / total if total > 0 else 0.0
     record_session(ud["progress"], "quiz", avg, total, ud.get("selected_topic"))
+    mark_dirty(context, flush_now=True)
     ud["state"] = "home"
     await reply_fn(f"<b>🎯 Quiz Complete!</b>\n\nQuestions: <b>{total}</b>\nScore: <b>{avg:.0%}</b>",
                    reply_markup=main_menu_keyboard(), parse_mode="HTML")
 
 
-async def finish_exam(reply_fn, ud: dict) -> None:
+async def finish_exam(reply_fn, ud: dict, context: ContextTypes.DEFAULT_TYPE) -> None:
     sess = ud["session"]
-    total = len(sess["questions"])
+    total = len(sess["qids"])
     points = (sess["score"] / total * EXAM_MAX_POINTS) if total > 0 else 0.0
     passed = points >= EXAM_PASS_THRESHOLD
     record_session(ud["progress"], "exam", points, int(EXAM_MAX_POINTS))
+    mark_dirty(context, flush_now=True)
     ud["state"] = "home"
     verdict = "✅ <b>PASSED — MEGFELELT</b>" if passed else "❌ <b>FAILED — NEM FELELT MEG</b>"
     msg = (f"<b>📝 Mock Exam Results</b>\n\n"
@@ -612,7 +894,9 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     if not context.user_data: context.user_data.update(init_user_data())
     elif "progress" not in context.user_data: context.user_data["progress"] = init_progress()
     ud = context.user_data
-    all_q: list = context.bot_data.get("questions", [])
+    bot_data = context.bot_data
+    sync_session(ud, bot_data)
+    mark_dirty(context)
     data = query.data
 
     if data.startswith("mode:"):
@@ -622,32 +906,32 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             await safe_edit(query, f"Select a topic for <b>{label}</b> mode:",
                             reply_markup=topic_keyboard(mode), parse_mode="HTML")
         elif mode == "weak":
-            qs = get_weak_questions(ud["progress"], all_q)
+            qs = get_weak_questions(ud["progress"], bot_data)
             if not qs:
                 await safe_edit(query, "🎉 No weak spots! You are doing great!",
                                 reply_markup=main_menu_keyboard())
                 return
-            start_session(ud, "quiz", qs)
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            start_session(ud, "quiz", [q["_qid"] for q in qs], bot_data)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
         elif mode == "srs":
-            qs = get_due_questions(ud["progress"], all_q)
+            qs = get_due_questions(ud["progress"], bot_data)
             if not qs:
                 await safe_edit(query, "⏰ No SRS cards due today! Check back tomorrow.",
                                 reply_markup=main_menu_keyboard())
                 return
             random.shuffle(qs)
-            start_session(ud, "learn", qs[:50])
-            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            start_session(ud, "learn", [q["_qid"] for q in qs[:50]], bot_data)
+            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
         elif mode == "exam":
             exam_qs = []
             for t in range(1, 7):
-                tqs = get_questions_for_topic(all_q, t)
+                tqs = bot_data["by_topic"].get(t, [])
                 exam_qs.extend(random.sample(tqs, 2) if len(tqs) >= 2 else tqs)
             random.shuffle(exam_qs)
-            start_session(ud, "exam", exam_qs)
+            start_session(ud, "exam", [q["_qid"] for q in exam_qs], bot_data)
             # F6 — store exam start time
             ud["session"]["exam_start"] = datetime.datetime.now().isoformat()
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
         elif mode == "stats":
             await send_statistics(lambda *a, **kw: safe_edit(query, *a, **kw), context)
 
@@ -655,19 +939,19 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         _, mode, tid_str = data.split(":")
         tid = int(tid_str)
         ud["selected_topic"] = tid
-        qs = get_questions_for_topic(all_q, tid)
+        qs = bot_data["by_topic"].get(tid, [])
         if not qs:
             await safe_edit(query, "No questions for that topic.", reply_markup=main_menu_keyboard())
             return
         # F2 — use weighted_sample for non-SRS modes
-        sampled = weighted_sample(list(qs), len(qs), ud["progress"])
-        start_session(ud, mode, sampled)
+        sampled = weighted_sample(qs, len(qs), ud["progress"])
+        start_session(ud, mode, [q["_qid"] for q in sampled], bot_data)
         if mode == "learn":
-            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
         elif mode == "mc":
-            await send_mc_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, all_q)
+            await send_mc_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
         elif mode == "quiz":
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
     elif data.startswith("back:"):
         ud["state"] = "home"
@@ -676,98 +960,98 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     elif data == "learn:reveal":
         sess = ud["session"]
         idx = sess["idx"]
-        q = sess["questions"][idx]
+        q = current_question(ud, bot_data)
         sess["revealed"] = True
         await safe_edit(query,
-            format_question_text(q, idx, len(sess["questions"]), "Learn") + format_answer_text(q),
+            format_question_text(q, idx, len(sess["qids"]), "Learn") + format_answer_text(q),
             reply_markup=rating_keyboard(), parse_mode="HTML")
 
     elif data.startswith("learn:rate:"):
         rating = int(data.split(":")[2])
         sess = ud["session"]
         idx = sess["idx"]
-        q = sess["questions"][idx]
+        q = current_question(ud, bot_data)
         # U11 — updated score mapping for 5-button scale
         score = (rating - 1) / 4.0
-        update_srs(ud["progress"], question_id(q["question_hu"]), srs_quality(score))
+        update_srs(ud["progress"], q["_qid"], srs_quality(score))
         record_attempt(ud["progress"], q, score)
         sess["score"] += score
         sess["idx"] += 1
-        if sess["idx"] >= len(sess["questions"]):
-            total = len(sess["questions"])
+        if sess["idx"] >= len(sess["qids"]):
+            total = len(sess["qids"])
             avg = sess["score"] / total if total > 0 else 0.0
             record_session(ud["progress"], "learn", avg, total, ud.get("selected_topic"))
+            mark_dirty(context, flush_now=True)
             ud["state"] = "home"
             await safe_edit(query,
                 f"<b>🎉 Session Complete!</b>\n\nCards: <b>{total}</b>  Avg: <b>{avg:.0%}</b>",
                 reply_markup=main_menu_keyboard(), parse_mode="HTML")
         else:
-            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_learn_card(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
     elif data.startswith("mc:answer:"):
         choice = int(data.split(":")[2])
         sess = ud["session"]
         idx = sess["idx"]
-        q = sess["questions"][idx]
+        q = current_question(ud, bot_data)
         opts = sess["options"]
         correct_ans = q["answer_hu"]
         is_correct = opts[choice] == correct_ans
         correct_idx = opts.index(correct_ans)
-        labels = ["A", "B", "C", "D"]
         score = 1.0 if is_correct else 0.0
         sess["score"] += score
         record_attempt(ud["progress"], q, score)
-        update_srs(ud["progress"], question_id(q["question_hu"]), srs_quality(score))
+        update_srs(ud["progress"], q["_qid"], srs_quality(score))
         icon = "✅" if is_correct else "❌"
         verdict = "Correct!" if is_correct else "Wrong!"
         feedback = f"{icon} <b>{verdict}</b>"
-        if not is_correct: feedback += f"\nCorrect: <b>{labels[correct_idx]}) {correct_ans}</b>"
-        text = format_question_text(q, idx, len(sess["questions"]), "Multiple Choice") + f"\n\n{feedback}"
+        if not is_correct: feedback += f"\nCorrect: <b>{MC_LABELS[correct_idx]}) {correct_ans}</b>"
+        text = format_question_text(q, idx, len(sess["qids"]), "Multiple Choice") + f"\n\n{feedback}"
         await safe_edit(query, text, reply_markup=next_keyboard("mc:next"), parse_mode="HTML")
 
     elif data == "mc:next":
         sess = ud["session"]
         sess["idx"] += 1
-        if sess["idx"] >= len(sess["questions"]):
-            total = len(sess["questions"])
+        if sess["idx"] >= len(sess["qids"]):
+            total = len(sess["qids"])
             sc = sess["score"]
             pct = int(sc / total * 100) if total > 0 else 0
             record_session(ud["progress"], "mc", sc, total, ud.get("selected_topic"))
+            mark_dirty(context, flush_now=True)
             ud["state"] = "home"
             await safe_edit(query,
                 f"<b>🎯 Multiple Choice Complete!</b>\n\nScore: <b>{round(sc)}/{total}</b> ({pct}%)",
                 reply_markup=main_menu_keyboard(), parse_mode="HTML")
         else:
-            await send_mc_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, all_q)
+            await send_mc_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
     elif data == "quiz:hint":
         sess = ud["session"]
         idx = sess["idx"]
-        q = sess["questions"][idx]
-        kws = q.get("keywords_hu", [])
-        masked = " | ".join(k[0] + "_" * (len(k) - 1) for k in kws) if kws else "<i>no keywords</i>"
+        q = current_question(ud, bot_data)
+        masked = q["_hint_masked"]
         sess["hint_used"] = True
-        text = format_question_text(q, idx, len(sess["questions"]), "Quiz")
+        text = format_question_text(q, idx, len(sess["qids"]), "Quiz")
         text += f"\n\n<b>💡 Hint (-20%):</b> {masked}\n<i>Type your answer below...</i>"
         await safe_edit(query, text, reply_markup=hint_next_keyboard(), parse_mode="HTML")
 
     elif data == "quiz:skip":
         sess = ud["session"]
-        q = sess["questions"][sess["idx"]]
+        q = current_question(ud, bot_data)
         record_attempt(ud["progress"], q, 0.0)
-        update_srs(ud["progress"], question_id(q["question_hu"]), 0)
+        update_srs(ud["progress"], q["_qid"], 0)
         sess["idx"] += 1
-        if sess["idx"] >= len(sess["questions"]):
+        if sess["idx"] >= len(sess["qids"]):
             await finish_quiz(lambda *a, **kw: safe_edit(query, *a, **kw), ud, context)
         else:
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
     elif data == "quiz:next":
         sess = ud["session"]
-        if sess["idx"] >= len(sess["questions"]):
+        if sess["idx"] >= len(sess["qids"]):
             await finish_quiz(lambda *a, **kw: safe_edit(query, *a, **kw), ud, context)
         else:
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
     elif data == "exam:next":
         sess = ud["session"]
@@ -775,17 +1059,20 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         if sess.get("mode") == "exam" and sess.get("exam_start"):
             elapsed = (datetime.datetime.now() - datetime.datetime.fromisoformat(sess["exam_start"])).seconds
             if elapsed > 45 * 60:
-                await finish_exam(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+                await finish_exam(lambda *a, **kw: safe_edit(query, *a, **kw), ud, context)
                 return
-        if sess["idx"] >= len(sess["questions"]):
-            await finish_exam(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+        if sess["idx"] >= len(sess["qids"]):
+            await finish_exam(lambda *a, **kw: safe_edit(query, *a, **kw), ud, context)
         else:
-            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud)
+            await send_quiz_question(lambda *a, **kw: safe_edit(query, *a, **kw), ud, bot_data)
 
 
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.user_data: context.user_data.update(init_user_data())
     ud = context.user_data
+    bot_data = context.bot_data
+    sync_session(ud, bot_data)
+    mark_dirty(context)
     state = ud.get("state", "home")
     if state not in ("quiz", "exam"):
         await update.message.reply_text("Use /start to open the study menu.", reply_markup=main_menu_keyboard())
@@ -795,15 +1082,15 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if sess.get("mode") == "exam" and sess.get("exam_start"):
         elapsed = (datetime.datetime.now() - datetime.datetime.fromisoformat(sess["exam_start"])).seconds
         if elapsed > 45 * 60:
-            await finish_exam(update.message.reply_text, ud)
+            await finish_exam(update.message.reply_text, ud, context)
             return
-    q = sess["questions"][sess["idx"]]
+    q = current_question(ud, bot_data)
     user_input = update.message.text.strip()
-    score, matched, missed = score_answer(user_input, q.get("keywords_hu", []))
+    score, matched, missed = score_answer(user_input, q.get("keywords_hu", []), q["_kw_norm"], q["_kw_norm_words"])
     if sess.get("hint_used"): score = max(0.0, score - 0.2)
     sess["score"] += score
     record_attempt(ud["progress"], q, score)
-    update_srs(ud["progress"], question_id(q["question_hu"]), srs_quality(score))
+    update_srs(ud["progress"], q["_qid"], srs_quality(score))
     pct = int(score * 100)
     icon = "✅" if score >= 0.6 else ("🔶" if score >= 0.3 else "❌")
     ans_hu = q.get("answer_hu", "")
@@ -825,9 +1112,29 @@ def load_questions() -> list:
     if not isinstance(data, list):
         print("ERROR: questions.json must be a JSON array.")
         sys.exit(1)
+    # IDs, normalised keywords, message bodies and hint masks derive from
+    # static text: compute them once
+    for q in data:
+        q["_qid"] = question_id(q["question_hu"])
+        q["_kw_norm"] = tuple(normalize_text(k) for k in q.get("keywords_hu", []))
+        q["_kw_norm_words"] = tuple(tuple(k.split()) for k in q["_kw_norm"])
+        kws = q.get("keywords_hu", [])
+        q["_qtext_static"] = question_body(q)
+        q["_hint_masked"] = " | ".join(k[0] + "_" * (len(k) - 1) for k in kws) if kws else "<i>no keywords</i>"
     return data
 
 
+def init_bot_data(bot_data: dict, questions: list) -> None:
+    """Store the question set and its lookup tables in *bot_data*."""
+    bot_data["questions"] = questions
+    bot_data["questions_by_id"] = {q["_qid"]: q for q in questions}
+    bot_data["legacy_ids"] = {legacy_question_id(q["question_hu"]): q["_qid"] for q in questions}
+    bot_data["all_answers"] = [q["answer_hu"] for q in questions]
+    bot_data["by_topic"] = {t: get_questions_for_topic(questions, t) for t in TOPIC_NAMES}
+    # Identifies this question set, so saved indexes built for another are rebuilt
+    bot_data["corpus_key"] = question_id("\n".join(bot_data["questions_by_id"]))
+
+
 def main() -> None:
     token = os.environ.get("TELEGRAM_TOKEN")
     if not token:
@@ -837,9 +1144,17 @@ def main() -> None:
         sys.exit(1)
     questions = load_questions()
     print(f"Loaded {len(questions)} questions.")
-    persistence = PicklePersistence(filepath=PERSISTENCE_FILE)
+    # bot_data is rebuilt from questions.json on every start and chat_data is
+    # unused, so only user data is persisted
+    persistence = PicklePersistence(
+        filepath=PERSISTENCE_FILE,
+        store_data=PersistenceInput(bot_data=False, chat_data=False, callback_data=False),
+        on_flush=True,
+        update_interval=PERSIST_INTERVAL,
+    )
     app = Application.builder().token(token).persistence(persistence).build()
-    app.bot_data["questions"] = questions
+    init_bot_data(app.bot_data, questions)
+    app.job_queue.run_repeating(flush_persistence, interval=PERSIST_INTERVAL, first=PERSIST_INTERVAL)
     app.add_handler(CommandHandler(["start", "menu"], cmd_start))
     app.add_handler(CommandHandler("stats", cmd_stats))
     app.add_handler(CommandHandler("remind", cmd_remind))